@@ -1,4 +1,6 @@
 import json
+import asyncio
+import threading
 from ai.openai_setup import openai_client
 import time
 import os
@@ -7,6 +9,7 @@ from anthropic import Anthropic
 from google import genai
 from google.genai import types
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from utils.constella.stella_chat import convert_anthropic_to_google
 
@@ -26,6 +29,12 @@ except Exception as e:
 # Inflection API
 inflection_api_key = os.getenv("INFLECTION_API_KEY")
 
+# Dedicated pool for iterate_stream_in_thread. A pump holds its thread for the whole response, so long
+# streams must not occupy the default executor that asyncio.to_thread and other offloaded calls use.
+# When every worker is busy, new streams wait for a free one instead of spawning more threads.
+max_stream_pump_workers = int(os.getenv("STREAM_PUMP_WORKERS", "32"))
+stream_pump_executor = ThreadPoolExecutor(max_workers=max_stream_pump_workers, thread_name_prefix="stream-pump")
+
 
 def create_word_completion(
 	messages: list,
@@ -358,7 +367,7 @@ def create_google_request(prompt: str, model_name: str = "gemini-2.0-flash-lite"
 		print(f"Error generating content with Google GenAI: {e}")
 		return None
 
-def create_new_google_request(prompt: str, model_name: str = "gemini-2.5-flash-preview-05-20", response_mime_type: str = "text/plain", temperature: float = 1, max_tokens: int = 100, thinking_budget_tokens: int = 100):
+def create_new_google_request(prompt: str, model_name: str = "gemini-2.5-flash-preview-05-20", response_mime_type: str = "text/plain", temperature: float = 1, max_tokens: int = 100, thinking_budget_tokens: int = 100, timeout_seconds: float = None):
 	"""
 	Create a new Google GenAI request with streaming response
 
@@ -366,6 +375,8 @@ def create_new_google_request(prompt: str, model_name: str = "gemini-2.5-flash-p
 		prompt (str): The input text prompt
 		model_name (str): The model to use
 		response_mime_type (str): The response format
+		timeout_seconds (float, optional): HTTP timeout for the request itself, so a caller that stops
+			waiting doesn't leave the call running (returns None once exceeded)
 
 	Returns:
 		str: The complete response text
@@ -383,7 +394,9 @@ def create_new_google_request(prompt: str, model_name: str = "gemini-2.5-flash-p
 			response_mime_type=response_mime_type,
 			temperature=temperature,
 			max_output_tokens=max_tokens,
-			thinking_config=types.ThinkingConfig(thinking_budget=thinking_budget_tokens) # 0 disables it
+			thinking_config=types.ThinkingConfig(thinking_budget=thinking_budget_tokens), # 0 disables it
+			# HttpOptions.timeout is in milliseconds
+			http_options=types.HttpOptions(timeout=int(timeout_seconds * 1000)) if timeout_seconds else None,
 		)
 
 		response = genai_client.models.generate_content(
@@ -535,6 +548,60 @@ def openai_tool_calls(
 		return None
 
 
+async def iterate_stream_in_thread(stream, max_buffered_events: int = 64):
+	"""
+	Iterate a blocking (sync) stream on stream_pump_executor so network reads do not block the event loop.
+
+	Events are handed over through a bounded asyncio.Queue. Use with contextlib.aclosing when
+	breaking out early so the worker is released immediately; closing the underlying stream
+	then ends the worker on its next read.
+
+	Args:
+		stream: Any sync iterable, e.g. the stream returned by openai_tool_calls(stream=True)
+		max_buffered_events (int): How many events the worker may read ahead
+
+	Yields:
+		The stream's events, in order
+	"""
+	loop = asyncio.get_running_loop()
+	queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_events)
+	stopped = threading.Event()
+	end_of_stream = object()
+
+	def put(item):
+		if not stopped.is_set():
+			asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+	def pump():
+		# The consumer may have gone away while this pump was queued for a worker
+		if stopped.is_set():
+			return
+		try:
+			for event in stream:
+				if stopped.is_set():
+					return
+				put(event)
+			put(end_of_stream)
+		except Exception as e:
+			put(e)
+
+	loop.run_in_executor(stream_pump_executor, pump)
+
+	try:
+		while True:
+			item = await queue.get()
+			if item is end_of_stream:
+				return
+			if isinstance(item, Exception):
+				raise item
+			yield item
+	finally:
+		# Unblock the worker if it is waiting on a full queue
+		stopped.set()
+		while not queue.empty():
+			queue.get_nowait()
+
+
 def create_json_schema(name: str, properties: dict, required_fields: list = None):
 	"""
 	Create a JSON schema for structured outputs
@@ -1,10 +1,13 @@
 import os
-import time
 import json
+import asyncio
+import httpx
 import requests
 import traceback
+from typing import AsyncIterator
 
 from ai.orb.llms.tool_impls import tool_impls
+from constants import is_dev
 
 max_chars_in_context = 300000
 
@@ -12,6 +15,18 @@ max_chars_in_context = 300000
 rerun_if_message_content_this_length = 15000  # If assistant message exceeds this length, force a rerun with shorter context
 max_retries_on_error = 2  # Maximum number of retries when OpenRouter returns an error
 
+openrouter_url = "https://openrouter.ai/api/v1/chat/completions"
+openrouter_stream_timeout_seconds = 120
+# Shared async client for the streamed (orb-ws-fast) calls, so each message reuses pooled keep-alive connections
+openrouter_stream_http_client = httpx.AsyncClient(
+	timeout=openrouter_stream_timeout_seconds,
+	limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+# Yielded between the text of two rounds (e.g. before and after a tool call), so they don't run together
+openrouter_stream_round_separator = "\n\n"
+# Returned (or yielded) in place of a model response when every attempt failed
+openrouter_error_response = "Sorry, I encountered an error while processing your request."
+
 def add_ocr_text_to_message(message: str, ocr_text: str):
 	"""Add the OCR text to the message"""
 	message += f"\nTo further help you understand the image of the screen sent to you, here is also the OCR text on the screen: {ocr_text}"
@@ -79,8 +94,9 @@ def openrouter_parse_orb_frontend_messages(messages: list, image_bytes: str = No
 				if next_role == curr_role:
 					parsed_messages.append({"role": "user" if curr_role == "assistant" else "assistant", "content": ""})
 
-		print('PARSED MESSAGES:')
-		print(parsed_messages)
+		if is_dev:
+			print('PARSED MESSAGES:')
+			print(parsed_messages)
 
 		# Enhance the last message with context and metadata
 		if parsed_messages and not screen_execute_mode:
@@ -146,6 +162,39 @@ def convert_frontend_messages_to_cerebras_messages(messages: list):
 
 	return cerebras_messages
 
+def get_openrouter_headers() -> dict:
+	"""Build the OpenRouter request headers from the environment API key"""
+	api_key = os.getenv("OPENROUTER_API_KEY")
+	if not api_key:
+		raise ValueError("OPENROUTER_API_KEY environment variable is required")
+
+	return {
+		"Authorization": f"Bearer {api_key}",
+		"Content-Type": "application/json"
+	}
+
+def build_openrouter_payload(messages: list, model: str, temperature: float, max_tokens: int, tools: list = None, parallel_tool_calls: bool = True, stream: bool = False) -> dict:
+	"""Build the chat completion payload, pinned to the Cerebras provider"""
+	data = {
+		"model": model,
+		"provider": {
+			"only": ["Cerebras"]
+		},
+		"messages": messages,
+		"temperature": temperature,
+		"max_tokens": max_tokens,
+		"parallel_tool_calls": parallel_tool_calls,
+		"tool_choice": "required"
+	}
+
+	# Add tools if provided
+	if tools:
+		data["tools"] = tools
+	if stream:
+		data["stream"] = True
+
+	return data
+
 async def stream_openrouter_response(
 	messages: list,
 	model: str = "qwen/qwen3-32b",
@@ -178,47 +227,24 @@ async def stream_openrouter_response(
 		if system_prompt:
 			messages.insert(0, {"role": "system", "content": system_prompt})
 
-		# OpenRouter API configuration
-		api_key = os.getenv("OPENROUTER_API_KEY")
-		if not api_key:
-			raise ValueError("OPENROUTER_API_KEY environment variable is required")
-			
-		url = "https://openrouter.ai/api/v1/chat/completions"
-		headers = {
-			"Authorization": f"Bearer {api_key}",
-			"Content-Type": "application/json"
-		}
+		headers = get_openrouter_headers()
 
 		retries = 0
 
 		while True:
 			try:
-				# Prepare request payload
-				data = {
-					"model": model,
-					"provider": {
-						"only": ["Cerebras"]
-					},
-					"messages": messages,
-					"temperature": temperature,
-					"max_tokens": max_tokens,
-					"parallel_tool_calls": parallel_tool_calls,
-					"tool_choice": "required"
-				}
-				
-				# Add tools if provided
-				if tools:
-					data["tools"] = tools
+				data = build_openrouter_payload(messages, model, temperature, max_tokens, tools, parallel_tool_calls)
 
-				# Make API request
-				response = requests.post(url, headers=headers, json=data)
+				# Make API request off the event loop so concurrent calls can overlap
+				response = await asyncio.to_thread(requests.post, openrouter_url, headers=headers, json=data)
 				response.raise_for_status()
 				
 				result = response.json()
 				
-				print("||| RESPONSE:")
-				print(result)
-				print("|||")
+				if is_dev:
+					print("||| RESPONSE:")
+					print(result)
+					print("|||")
 
 				msg = result['choices'][0]['message']
 
@@ -253,13 +279,135 @@ async def stream_openrouter_response(
 				retries += 1
 				if retries > max_retries_on_error:
 					raise e
-				time.sleep(1)
+				await asyncio.sleep(1)
 
 	except Exception as e:
 		print(f"Error streaming OpenRouter response: {e}")
 		import traceback
 		traceback.print_exc()
-		return "Sorry, I encountered an error while processing your request."
+		return openrouter_error_response
+
+async def stream_openrouter_response_chunks(
+	messages: list,
+	model: str = "qwen/qwen3-32b",
+	temperature: float = 0.7,
+	max_tokens: int = 1000,
+	system_prompt: str = None,
+	extra_args: dict = None,
+	tools: list = None,
+	multi_turn_mode: bool = True,
+	parallel_tool_calls: bool = True
+) -> AsyncIterator[str]:
+	"""
+	Stream a response from Cerebras models via OpenRouter, yielding text as it arrives.
+	Tool calls are assembled from the streamed deltas and run between rounds like
+	stream_openrouter_response, with the same context trimming on retry and rerun of too-long responses.
+
+	Differences from stream_openrouter_response, since text is sent before a round is known to be final:
+	- Text from every round is yielded (not just the final one), with openrouter_stream_round_separator
+	  between rounds.
+	- A failed round is only retried if it has not yielded any text yet.
+	- A too-long response is cut off at rerun_if_message_content_this_length (the part already yielded stays)
+	  and rerun after the separator.
+
+	Args:
+		Same as stream_openrouter_response
+
+	Yields:
+		str: Text chunks of the response
+	"""
+	try:
+		messages = convert_frontend_messages_to_cerebras_messages(messages)
+
+		if system_prompt:
+			messages.insert(0, {"role": "system", "content": system_prompt})
+
+		headers = get_openrouter_headers()
+
+		retries = 0
+		has_yielded_text = False
+
+		while True:
+			content = ""
+			tool_call_chunks: dict[int, dict] = {}
+			too_long = False
+			try:
+				data = build_openrouter_payload(messages, model, temperature, max_tokens, tools, parallel_tool_calls, stream=True)
+
+				async with openrouter_stream_http_client.stream("POST", openrouter_url, headers=headers, json=data) as response:
+					response.raise_for_status()
+
+					async for line in response.aiter_lines():
+						# Server-sent events, skipping keep-alive comments
+						if not line.startswith("data: "):
+							continue
+						payload = line[len("data: "):]
+						if payload == "[DONE]":
+							break
+
+						choices = json.loads(payload).get("choices") or []
+						if not choices:
+							continue
+						delta = choices[0].get("delta") or {}
+
+						if delta.get("content"):
+							if not content and has_yielded_text:
+								yield openrouter_stream_round_separator
+							content += delta["content"]
+							has_yielded_text = True
+							yield delta["content"]
+							if len(content) > rerun_if_message_content_this_length:
+								too_long = True
+								break
+
+						for tc in delta.get("tool_calls") or []:
+							chunk = tool_call_chunks.setdefault(tc.get("index", 0), {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+							if tc.get("id"):
+								chunk["id"] = tc["id"]
+							function = tc.get("function") or {}
+							if function.get("name"):
+								chunk["function"]["name"] = function["name"]
+							if function.get("arguments"):
+								chunk["function"]["arguments"] += function["arguments"]
+			except Exception as e:
+				retries += 1
+				if content or retries > max_retries_on_error:
+					raise e
+				# Same as stream_openrouter_response: try again with a wait + reduced context
+				messages[-1]["content"] = messages[-1]["content"][:max_chars_in_context - 5000]
+				await asyncio.sleep(1)
+				continue
+
+			msg = {"role": "assistant", "content": content}
+			if tool_call_chunks and not too_long:
+				msg["tool_calls"] = list(tool_call_chunks.values())
+
+			# Save the assistant turn exactly as streamed
+			messages.append(msg)
+
+			if too_long:
+				retries += 1
+				if retries > max_retries_on_error:
+					return
+				messages.append({
+					"role": "user",
+					"content": "Your response was too long and you didn't take all the actions. I have already given you all the instructions. Do all the tasks I requested and then give me just a single sentence final response back."
+				})
+				continue
+
+			if not tool_call_chunks:
+				return
+
+			for tool_call in msg["tool_calls"]:
+				await run_openrouter_tool_call(tool_call, extra_args=extra_args, messages=messages)
+
+			if not multi_turn_mode:
+				return
+
+	except Exception as e:
+		print(f"Error streaming OpenRouter response chunks: {e}")
+		traceback.print_exc()
+		yield openrouter_error_response
 
 async def run_openrouter_tool_call(
 	tool_call,
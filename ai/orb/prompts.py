@@ -1,5 +1,6 @@
 import traceback
 import base64
+from functools import lru_cache
 from utils.constella.stella_chat import get_max_chars_in_context
 from ai.orb.debug import write_image_to_file
 
@@ -166,20 +167,27 @@ def get_orb_system_prompt(messages: list, about_user: str = "", user_instruction
 	Returns:
 	str: The system prompt adjusted for the current conversation
 	"""
-	prompt = orb_system_prompt
-
 	# if orb_tapped_to_hold:
 	# 	print("ORB TAPPED TO HOLD")
 	# 	prompt += f"\n\nBe slightly biased towards calling just the input_text tool call and generating a response appropriate to the screen and the user's inferred intention here based on their screen and / or their request.\nIf it is very obvious they are requesting a generation, definitely call the input_text tool call without asking the user if they would like to input it.\n\nHowever, if they are not requesting anything generation related, then do not call any tool calls and respond normally."
 
+	# The ocr_text and selected_text should have already been incorporated
+	# into the content of the last message in parse_horizon_frontend_messages
+	# so the prompt only depends on the user personalization
+	return _build_orb_system_prompt(about_user, user_instructions, user_mode)
+
+
+@lru_cache(maxsize=256)
+def _build_orb_system_prompt(about_user: str, user_instructions: str, user_mode: str) -> str:
+	"""
+	Memoized so the same user gets a byte-identical prompt every turn without rebuilding it
+	"""
+	prompt = orb_system_prompt
+
 	custom_prompt = get_custom_prompt(about_user, user_instructions, user_mode)
 	if custom_prompt:
 		prompt += f"\n{custom_prompt}"
-	
-	# The ocr_text and selected_text should have already been incorporated
-	# into the content of the last message in parse_horizon_frontend_messages
-	# This function now just returns the base system prompt
-	
+
 	return prompt
 
 
@@ -400,8 +408,52 @@ def convert_anthropic_to_google(messages: list):
 	return google_messages
 
 
-def get_execute_screen_system_prompt():
-	return """
+def convert_openai_to_anthropic(messages: list):
+	"""
+	Convert messages already parsed by parse_orb_frontend_messages(model="openai") to the Anthropic
+	format, so a fallback does not need to re-parse the frontend messages and keeps the screenshot
+
+	Args:
+		messages (list): OpenAI Responses-style messages, where content is a string or a list of
+		input_text / input_image blocks
+
+	Returns:
+		list: Anthropic-style messages with 'role' and 'content'
+	"""
+	anthropic_messages = []
+
+	for message in messages:
+		content = message["content"]
+		if isinstance(content, str):
+			anthropic_messages.append({"role": message["role"], "content": content})
+			continue
+
+		blocks = []
+		for block in content:
+			if block.get("type") == "input_text":
+				blocks.append({"type": "text", "text": block.get("text", "")})
+			elif block.get("type") == "input_image":
+				try:
+					# Image urls are data urls, i.e. data:image/jpeg;base64,<data>
+					header, base64_data = block["image_url"].split(',', 1)
+					media_type = header.split(':')[1].split(';')[0]
+					blocks.append({
+						"type": "image",
+						"source": {
+							"type": "base64",
+							"media_type": media_type,
+							"data": base64_data
+						}
+					})
+				except Exception as e:
+					print(f"Error converting image block for Anthropic: {e}")
+
+		anthropic_messages.append({"role": message["role"], "content": blocks})
+
+	return anthropic_messages
+
+
+execute_screen_system_prompt = """
 	You do not talk to the user. You simply execute tool (function) calls to get the user's screen action task done.
 	The user is a human being using their computer for various reasons and you have to figure out the right tool
 	calls to help automate their screen and get things done for them.
@@ -413,4 +465,28 @@ def get_execute_screen_system_prompt():
 	1. Pick the most appropriate tool call to advance towards the goal by changing the screen towards it.
 	2. Think about the overall goal and typical screen UI flows and execute the click or input text appropriately.
 	</tool_calls>
-	"""
\ No newline at end of file
+	"""
+
+
+def get_execute_screen_system_prompt():
+	return execute_screen_system_prompt
+
+
+@lru_cache(maxsize=128)
+def get_screen_execute_session_system_prompt(goal: str = None, metric_to_track: str = None, description_of_screen: str = None) -> str:
+	"""
+	System prompt for a screen-execute session, with the session's static context appended.
+
+	The goal, metric and initial screen description are fixed for the whole session, so keeping
+	them in the system prompt (instead of the per-frame user message) makes system prompt + tools
+	one stable prefix the provider can cache. Memoized so every frame, and every session sharing
+	the same context, sends the exact same string.
+	"""
+	parts = [execute_screen_system_prompt]
+	if goal:
+		parts.append(f"GOAL: {goal}")
+	if metric_to_track:
+		parts.append(f"METRIC TO TRACK: {metric_to_track}")
+	if description_of_screen:
+		parts.append(f"INITIAL SCREEN DESCRIPTION (to help decide what elements to interact with, may have changed): {description_of_screen}")
+	return "\n".join(parts)
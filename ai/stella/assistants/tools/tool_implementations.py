@@ -10,17 +10,41 @@ from ai.embeddings import create_embedding
 from datetime import datetime
 from pydantic import BaseModel, HttpUrl, Field
 import traceback
+import threading
 import httpx
 import html2text
 from googleapiclient.discovery import build
 import os
 import json
 from typing import Any, Dict
+from fastapi.concurrency import run_in_threadpool
 from websockets.exceptions import ConnectionClosedError
 
 google_constella_api_key = os.environ.get('GOOGLE_CONSTELLA_API_KEY')
 google_search_cx_uniqueid = 'c41e4d932d6f543f2'
 
+# Shared async client so page fetches reuse pooled connections instead of a new client per tool call
+website_http_client = httpx.AsyncClient(follow_redirects=True)
+
+# googleapiclient services are not thread-safe, so each threadpool worker builds and keeps its own
+_google_search_local = threading.local()
+
+def _get_google_search_service():
+	service = getattr(_google_search_local, 'service', None)
+	if service is None:
+		service = build("customsearch", "v1", developerKey=google_constella_api_key)
+		_google_search_local.service = service
+	return service
+
+def _run_google_search(query: str, num: int):
+	return _get_google_search_service().cse().list(
+		q=query,
+		cx=google_search_cx_uniqueid,
+		num=num,  # Changed from results to num
+		# exactTerms=exactTerms,
+		# excludeTerms=excludeTerms
+	).execute()
+
 
 def clean_results(results):
 	"""
@@ -80,8 +104,7 @@ async def get_website_url_content(url: HttpUrl, ignore_links: bool = False, max_
 	'''
 	header = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'}
 	try:
-		async with httpx.AsyncClient(follow_redirects=True) as client:
-			response = await client.get(str(url), headers=header, timeout=5)
+		response = await website_http_client.get(str(url), headers=header, timeout=5)
 	except Exception as e:
 		print('Error in webscrape: ', e)
 		return "Error fetching the url "+str(url)
@@ -95,19 +118,13 @@ async def get_website_url_content(url: HttpUrl, ignore_links: bool = False, max_
 
 async def google_search(query: str, results: int = 5, exactTerms: str = None, excludeTerms: str = None, tenant_name:str=None):
 	# foundational search function returns a google search result object
-	service = build("customsearch", "v1", developerKey=google_constella_api_key)
 	try:
 		# 'results' parameter should be 'num' according to the API docs
 		# Ensure results is between 1 and 10
 		num = max(1, min(10, results))
 		
-		result = service.cse().list(
-			q=query,
-			cx=google_search_cx_uniqueid,
-			num=num,  # Changed from results to num
-			# exactTerms=exactTerms,
-			# excludeTerms=excludeTerms
-		).execute()
+		# execute() is blocking HTTP, so run it off the event loop
+		result = await run_in_threadpool(_run_google_search, query, num)
 	except Exception as e:
 		print('Error in google_search: ', e)
 		traceback.print_exc()
@@ -6,13 +6,15 @@ from typing import List, Dict
 import traceback
 from db.models.constella.frontend.message import Message
 from db.models.constella.frontend.assistant_request import AssistantRequest
+from utils.graph_window import select_relevant_graph_slice
 
 max_chars_in_context = 255000
 
 def format_stella_assistant_instructions(request: AssistantRequest):
+	nodes, edges = select_relevant_graph_slice(request.nodes, request.edges, request.viewport)
 	message = f"""User's request: {request.user_message}
-	Nodes on user's graph:{request.nodes}
-	Edges on user's graph:{request.edges}
+	Nodes on user's graph:{nodes}
+	Edges on user's graph:{edges}
 	Viewport on user's graph:{request.viewport}
 	"""
 	
@@ -47,8 +49,9 @@ def get_prompt_instructions_from_user_data_for_voice_convo(request: AssistantReq
 	Only includes node titles to keep the context concise for voice interactions.
 	"""
 	node_titles = []
+	nodes, _ = select_relevant_graph_slice(request.nodes, request.edges, request.viewport)
 	
-	for node in request.nodes:
+	for node in nodes:
 		if hasattr(node, 'data') and hasattr(node.data, 'note') and hasattr(node.data.note, 'rxdbData'):
 			title = node.data.note.rxdbData.title
 			if title:
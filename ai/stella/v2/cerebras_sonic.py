@@ -1,15 +1,22 @@
+import asyncio
 import os
-import time
 import json
+import httpx
 from cerebras.cloud.sdk import Cerebras
 import ai.stella.assistants.tools.tool_implementations as tool_impls
-import requests
 
 
 max_chars_in_context = 40000
 max_retries_on_error = 10
 rerun_if_message_content_this_length = 300
 
+# Shared async client so every assistant-v3 socket on this worker reuses pooled keep-alive connections to OpenRouter
+openrouter_url = "https://openrouter.ai/api/v1/chat/completions"
+openrouter_http_client = httpx.AsyncClient(
+	timeout=httpx.Timeout(60.0, connect=10.0),
+	limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+
 client = Cerebras(
 	# This is the default and can be omitted
 	api_key=os.environ.get("CEREBRAS_API_KEY"),
@@ -158,7 +165,7 @@ async def stream_cerebras_response(
 				retries += 1
 				if retries > max_retries_on_error:
 					raise e
-				time.sleep(1)
+				await asyncio.sleep(1)
 					
 	except Exception as e:
 		print(f"Error streaming Cerebras response: {e}")
@@ -198,7 +205,6 @@ async def stream_openrouter_response(
 		if not api_key:
 			raise ValueError("OPENROUTER_API_KEY environment variable is required")
 			
-		url = "https://openrouter.ai/api/v1/chat/completions"
 		headers = {
 			"Authorization": f"Bearer {api_key}",
 			"Content-Type": "application/json"
@@ -219,9 +225,12 @@ async def stream_openrouter_response(
 					"max_tokens": max_tokens,
 					"tools": assistant_tools,
 				}
+				# Stable per-user id so OpenRouter keeps routing a user's turns to the same provider cache
+				if extra_args and extra_args.get("tenant_name"):
+					data["user"] = extra_args["tenant_name"]
 
 				# Make API request
-				response = requests.post(url, headers=headers, json=data)
+				response = await openrouter_http_client.post(openrouter_url, headers=headers, json=data)
 				response.raise_for_status()
 				
 				result = response.json()
@@ -252,7 +261,7 @@ async def stream_openrouter_response(
 				retries += 1
 				if retries > max_retries_on_error:
 					raise e
-				time.sleep(1)
+				await asyncio.sleep(1)
 
 	except Exception as e:
 		print(f"Error streaming OpenRouter response: {e}")
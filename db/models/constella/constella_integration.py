@@ -2,9 +2,27 @@ from db.mongodb import db
 from datetime import datetime
 from utils.json import parse_json
 from typing import Any
+from pymongo import UpdateOne
+from cachetools import TTLCache
+import threading
 
 collection = db['constella_integration']
 
+# Short-lived per-process cache of get_by_email results, invalidated on every write for that user.
+# Guarded by a lock since integration syncs read from worker threads
+integration_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+integration_cache_lock = threading.Lock()
+
+def invalidate_integration_cache(user_email: str):
+	with integration_cache_lock:
+		integration_cache.pop(user_email, None)
+
+# Every lookup and update filters on user_email
+try:
+	collection.create_index("user_email")
+except Exception as e:
+	print(f"Error creating constella_integration user_email index: {e}")
+
 class Integration:
 	def __init__(self, apiKey: str = None, lastUpdated: datetime = None, arcade: dict = None):
 		self.apiKey = apiKey
@@ -24,15 +42,26 @@ class ConstellaIntegration:
 			"integrations": {name: integration.__dict__ for name, integration in self.integrations.items()}
 		}
 		collection.insert_one(data)
+		invalidate_integration_cache(self.user_email)
 
 	@staticmethod
-	def get_by_email(user_email: str):
+	def get_by_email(user_email: str, use_cache: bool = True):
+		# use_cache=False is for status polling: writes from other workers don't invalidate this process's cache
+		if use_cache:
+			with integration_cache_lock:
+				cached = integration_cache.get(user_email)
+			if cached is not None:
+				return cached
+
 		data = collection.find_one({"user_email": user_email})
 		if data:
 			data = parse_json(data)
 			# Convert stored data back to ConstellaIntegration object
 			integrations = {name: Integration(**details.__dict__ if isinstance(details, Integration) else details) for name, details in data.get("integrations", {}).items()}
-			return ConstellaIntegration(user_email=data["user_email"], integrations=integrations)
+			integration = ConstellaIntegration(user_email=data["user_email"], integrations=integrations)
+			with integration_cache_lock:
+				integration_cache[user_email] = integration
+			return integration
 		return None
 
 	@staticmethod
@@ -41,6 +70,7 @@ class ConstellaIntegration:
 			{"user_email": user_email},
 			{"$set": {f"integrations.{integration_name}": {"apiKey": apiKey, "lastUpdated": lastUpdated}}}
 		)
+		invalidate_integration_cache(user_email)
 
 	@staticmethod
 	def get_all():
@@ -48,27 +78,52 @@ class ConstellaIntegration:
 
 	@staticmethod
 	def update_integration_property(user_email: str, integration_name: str, property_name: str, property_value: Any):
-		# Always update the requested property; also bump lastUpdated unless explicitly setting it
-		set_fields = {f"integrations.{integration_name}.{property_name}": property_value}
-		if property_name != "lastUpdated":
+		ConstellaIntegration.update_integration_properties(user_email, integration_name, {property_name: property_value})
+
+	@staticmethod
+	def update_integration_properties(user_email: str, integration_name: str, properties: dict):
+		# Set several properties in one round-trip; also bump lastUpdated unless explicitly setting it.
+		# Upsert creates the user's document / integration entry if it does not exist yet
+		set_fields = {f"integrations.{integration_name}.{name}": value for name, value in properties.items()}
+		if "lastUpdated" not in properties:
 			set_fields[f"integrations.{integration_name}.lastUpdated"] = datetime.utcnow()
 
-		result = collection.update_one(
+		collection.update_one(
 			{"user_email": user_email},
-			{"$set": set_fields}
+			{"$set": set_fields},
+			upsert=True
 		)
+		invalidate_integration_cache(user_email)
 
-		if result.matched_count == 0:
-			# Create new integration document for this user/integration
-			integration_doc = {property_name: property_value}
-			if property_name != "lastUpdated":
-				integration_doc["lastUpdated"] = datetime.utcnow()
+	@staticmethod
+	def bulk_update_integration_properties(updates: list):
+		"""
+		Apply many (user_email, integration_name, property_name, property_value) updates in one bulk_write.
+		Updates are grouped into a single upserting $set per user, bumping each touched integration's
+		lastUpdated unless it is explicitly set. Returns the pymongo BulkWriteResult.
+		"""
+		set_fields_by_user = {}
+		explicit_last_updated = set()
+		for user_email, integration_name, property_name, property_value in updates:
+			set_fields = set_fields_by_user.setdefault(user_email, {})
+			set_fields[f"integrations.{integration_name}.{property_name}"] = property_value
+			if property_name == "lastUpdated":
+				explicit_last_updated.add((user_email, integration_name))
 
-			new_integration = {
-				"user_email": user_email,
-				"integrations": {integration_name: integration_doc}
-			}
-			collection.insert_one(new_integration)
+		now = datetime.utcnow()
+		for user_email, integration_name, _, _ in updates:
+			if (user_email, integration_name) not in explicit_last_updated:
+				set_fields_by_user[user_email][f"integrations.{integration_name}.lastUpdated"] = now
+
+		operations = [
+			UpdateOne({"user_email": user_email}, {"$set": set_fields}, upsert=True)
+			for user_email, set_fields in set_fields_by_user.items()
+		]
+		try:
+			return collection.bulk_write(operations, ordered=False)
+		finally:
+			for user_email in set_fields_by_user:
+				invalidate_integration_cache(user_email)
 
 	@staticmethod
 	def remove_integration(user_email: str, integration_name: str):
@@ -76,4 +131,5 @@ class ConstellaIntegration:
 		collection.update_one(
 			{"user_email": user_email},
 			{"$unset": {f"integrations.{integration_name}": ""}}
-		)
\ No newline at end of file
+		)
+		invalidate_integration_cache(user_email)
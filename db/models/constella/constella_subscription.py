@@ -1,8 +1,11 @@
 from bson import ObjectId
-from pymongo import MongoClient
-from db.mongodb import db
+from pymongo import MongoClient, ReturnDocument
+from db.mongodb import db, get_async_db
 from datetime import datetime, timedelta
 import traceback
+import functools
+import threading
+from cachetools import TTLCache
 from utils.json import parse_json
 import uuid
 from utils.constella.financials.subscriptions import get_stella_credits
@@ -12,10 +15,45 @@ collection = db['constella_subscriptions']
 
 free_stella_credits = 2
 
+# Short-lived per-process cache for the hot read paths (get_user_info_cached etc.).
+# Any write through this model clears it, since one row can be cached under several keys, but only in the
+# worker that wrote; other gunicorn workers can serve the previous row for up to the TTL. Misses (None) are
+# never cached, so a subscription created in another worker (checkout, webhooks) shows up on the next read
+subscription_cache: TTLCache = TTLCache(maxsize=10_000, ttl=10)
+subscription_cache_lock = threading.Lock()
+
+def invalidates_subscription_cache(func):
+	"""Clear subscription_cache after a write method runs (even if it raised part way)"""
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		try:
+			return func(*args, **kwargs)
+		finally:
+			with subscription_cache_lock:
+				subscription_cache.clear()
+	return wrapper
+
+def get_async_collection():
+	"""constella_subscriptions on the async client, for async def routes"""
+	return get_async_db()['constella_subscriptions']
+
+# get_user_info / get_all_user_subscriptions query with $or over these fields; one index per field
+# lets every $or clause use an index scan instead of a collection scan
+try:
+	for indexed_field in ["email", "auth_user_id", "license_key", "stripe_customer_id"]:
+		collection.create_index(indexed_field)
+	# External API requests authenticate via get_subscription_by_api_key; most rows have no key
+	collection.create_index("api_key", sparse=True)
+	# set_plan_for_active_subscriptions_without_plan filters on both
+	collection.create_index([("period_end", 1), ("plan_name", 1)])
+except Exception as e:
+	print(f"Error creating constella_subscriptions indexes: {e}")
+
 class ConstellaSubscription:
 	def __init__(self, stripe_customer_id: str):
 		self.stripe_customer_id = stripe_customer_id
 
+	@invalidates_subscription_cache
 	def save(self):
 		collection.insert_one(self.__dict__)
 	
@@ -24,9 +62,38 @@ class ConstellaSubscription:
 		return str(uuid.uuid4())
 	
 	@staticmethod
+	@invalidates_subscription_cache
 	def create_subscription(stripe_customer_id: str, email: str, period_end: datetime = None, subscription_id: str = None, product_id: str = None, auth_user_id: str = None, stella_credits_grant: int = free_stella_credits, plan_name: str = None):
+		sub = ConstellaSubscription._new_subscription(stripe_customer_id, email, period_end, subscription_id, product_id, auth_user_id, stella_credits_grant, plan_name)
+		res = collection.insert_one(sub)
+		sub['_id'] = str(res.inserted_id)
+		return sub
+
+	@staticmethod
+	@invalidates_subscription_cache
+	def get_or_create_subscription(stripe_customer_id: str, email: str, period_end: datetime = None, auth_user_id: str = None, stella_credits_grant: int = free_stella_credits, plan_name: str = None):
+		"""
+		Returns the subscription for email, inserting one (same fields as create_subscription) if none exists,
+		in a single upsert round trip. Concurrent callers for the same email then mostly get the existing row,
+		but without a unique index on email two upserts can still both insert, so this narrows the race only.
+		Returns (subscription, created)
+		"""
+		sub = ConstellaSubscription._new_subscription(stripe_customer_id, email, period_end, None, None, auth_user_id, stella_credits_grant, plan_name)
+		result = collection.find_one_and_update(
+			{"email": email},
+			{"$setOnInsert": sub},
+			upsert=True,
+			return_document=ReturnDocument.AFTER
+		)
+		# The generated license key only ends up on the row if this call inserted it
+		created = result.get('license_key') == sub['license_key']
+		return parse_json(result), created
+
+	@staticmethod
+	def _new_subscription(stripe_customer_id: str, email: str, period_end: datetime = None, subscription_id: str = None, product_id: str = None, auth_user_id: str = None, stella_credits_grant: int = free_stella_credits, plan_name: str = None):
+		"""Fields of a newly created subscription row"""
 		now = datetime.now()
-		sub = {
+		return {
 			"stripe_customer_id": stripe_customer_id,
 			"email": email,
 			"period_end": period_end,
@@ -39,11 +106,9 @@ class ConstellaSubscription:
 			"plan_name": plan_name,
 			"next_renewal_date": now + timedelta(days=30) if "yearly" in (plan_name or "") else None
 		}
-		res = collection.insert_one(sub)
-		sub['_id'] = str(res.inserted_id)
-		return sub
 		
 	@staticmethod
+	@invalidates_subscription_cache
 	def create_or_update_subscription(stripe_customer_id: str, email: str, period_end: datetime, subscription_id: str, product_id: str, plan_name: str):
 		subscription = collection.find_one({"stripe_customer_id": stripe_customer_id})
 		if subscription:
@@ -59,6 +124,7 @@ class ConstellaSubscription:
 			ConstellaSubscription.create_subscription(stripe_customer_id, email, period_end, subscription_id, product_id, plan_name)
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def create_or_update_subscription_v2(_id: str, stripe_customer_id: str, email: str, period_end: datetime, subscription_id: str, product_id: str, stella_credits_grant: int = 0, plan_name: str = '', auth_user_id: str = None):
 		subscription = None
 		
@@ -152,6 +218,14 @@ class ConstellaSubscription:
 			return None
 		return parse_json(result)
 	
+	@staticmethod
+	async def get_subscription_by_license_key_async(license_key: str):
+		"""get_subscription_by_license_key without blocking the event loop"""
+		result = await get_async_collection().find_one({"license_key": license_key})
+		if result is None:
+			return None
+		return parse_json(result)
+	
 	@staticmethod
 	def _get_best_subscription(results):
 		"""
@@ -185,6 +259,26 @@ class ConstellaSubscription:
 		Combines all matches across fields and returns the one with latest period_end,
 		or last one if none have period_end.
 		"""
+		query = ConstellaSubscription._get_user_info_query(email, auth_user_id, license_key)
+		if not query:
+			return None
+
+		results = list(collection.find(query))
+		return ConstellaSubscription._get_best_subscription(results)
+
+	@staticmethod
+	async def get_user_info_async(email: str, auth_user_id: str = None, license_key: str = None):
+		"""get_user_info without blocking the event loop"""
+		query = ConstellaSubscription._get_user_info_query(email, auth_user_id, license_key)
+		if not query:
+			return None
+
+		results = await get_async_collection().find(query).to_list(None)
+		return ConstellaSubscription._get_best_subscription(results)
+
+	@staticmethod
+	def _get_user_info_query(email: str, auth_user_id: str = None, license_key: str = None):
+		"""$or query over the provided identifiers, or None if none were provided"""
 		query = {"$or": []}
 		if email:
 			query["$or"].append({"email": email})
@@ -195,11 +289,85 @@ class ConstellaSubscription:
 
 		if not query["$or"]:
 			return None
+		return query
 
-		results = list(collection.find(query))
-		return ConstellaSubscription._get_best_subscription(results)
+	@staticmethod
+	def get_user_info_cached(email: str, auth_user_id: str = None, license_key: str = None):
+		"""
+		get_user_info served from a short-lived in-process cache, for read-only client polling
+		(subscription fetches, license checks). Paths that must see the latest write use get_user_info.
+		"""
+		key = ("user_info", email, auth_user_id, license_key)
+		with subscription_cache_lock:
+			cached = subscription_cache.get(key)
+		if cached is not None:
+			return cached
+		subscription = ConstellaSubscription.get_user_info(email, auth_user_id, license_key)
+		if subscription is not None:
+			with subscription_cache_lock:
+				subscription_cache[key] = subscription
+		return subscription
+
+	@staticmethod
+	async def get_user_info_cached_async(email: str, auth_user_id: str = None, license_key: str = None):
+		"""get_user_info_cached with the Mongo read awaited on the async client"""
+		key = ("user_info", email, auth_user_id, license_key)
+		with subscription_cache_lock:
+			cached = subscription_cache.get(key)
+		if cached is not None:
+			return cached
+		subscription = await ConstellaSubscription.get_user_info_async(email, auth_user_id, license_key)
+		if subscription is not None:
+			with subscription_cache_lock:
+				subscription_cache[key] = subscription
+		return subscription
+
+	@staticmethod
+	def get_subscription_by_license_key_cached(license_key: str):
+		"""get_subscription_by_license_key served from the same short-lived cache"""
+		key = ("license_key", license_key)
+		with subscription_cache_lock:
+			cached = subscription_cache.get(key)
+		if cached is not None:
+			return cached
+		subscription = ConstellaSubscription.get_subscription_by_license_key(license_key)
+		if subscription is not None:
+			with subscription_cache_lock:
+				subscription_cache[key] = subscription
+		return subscription
+
+	@staticmethod
+	async def get_subscription_by_license_key_cached_async(license_key: str):
+		"""get_subscription_by_license_key_cached with the Mongo read awaited on the async client"""
+		key = ("license_key", license_key)
+		with subscription_cache_lock:
+			cached = subscription_cache.get(key)
+		if cached is not None:
+			return cached
+		subscription = await ConstellaSubscription.get_subscription_by_license_key_async(license_key)
+		if subscription is not None:
+			with subscription_cache_lock:
+				subscription_cache[key] = subscription
+		return subscription
 
 	@staticmethod
+	def get_all_user_subscriptions(email: str = None, auth_user_id: str = None):
+		"""
+		Returns every subscription row matching the email or auth_user_id (not just the best one).
+		"""
+		query = {"$or": []}
+		if email:
+			query["$or"].append({"email": email})
+		if auth_user_id:
+			query["$or"].append({"auth_user_id": auth_user_id})
+
+		if not query["$or"]:
+			return []
+
+		return list(collection.find(query))
+
+	@staticmethod
+	@invalidates_subscription_cache
 	def update_auth_user_id(_id: str, auth_user_id: str):
 		"""
 		Updates the auth_user_id for a subscription based on the _id.
@@ -222,6 +390,11 @@ class ConstellaSubscription:
 		return list(collection.find({}))
 
 	@staticmethod
+	def count_all():
+		return collection.count_documents({})
+
+	@staticmethod
+	@invalidates_subscription_cache
 	def delete_all():
 		collection.delete_many({})
 
@@ -233,6 +406,7 @@ class ConstellaSubscription:
 		return f"csk_{str(uuid.uuid4())}"
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def add_api_key(subscription_id: str = None, auth_user_id: str = None):
 		"""
 		Adds an API key to an existing subscription.
@@ -285,6 +459,7 @@ class ConstellaSubscription:
 			return None
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def rotate_api_key(subscription_id: str):
 		"""
 		Generates a new API key for an existing subscription.
@@ -293,6 +468,7 @@ class ConstellaSubscription:
 		return ConstellaSubscription.add_api_key(subscription_id)
 	
 	@staticmethod
+	@invalidates_subscription_cache
 	def increment_stella_credits(subscription_id: str, credits: int):
 		"""
 		Updates the number of credits for a subscription.
@@ -300,6 +476,7 @@ class ConstellaSubscription:
 		collection.update_one({"_id": ObjectId(subscription_id)}, {"$inc": {"stella_credits": credits}})
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def distribute_monthly_credits_to_yearly():
 		"""
 		Distributes monthly credits to active yearly subscribers who have reached
@@ -334,6 +511,7 @@ class ConstellaSubscription:
 				print(f"Error granting monthly credits to subscription {sub['_id']}: {str(e)}")
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def update_plan(subscription_id: str, plan_name: str):
 		"""
 		Updates only the plan name for a subscription.
@@ -362,6 +540,52 @@ class ConstellaSubscription:
 			return False
 
 	@staticmethod
+	@invalidates_subscription_cache
+	def set_plan_for_active_subscriptions_without_plan(plan_name: str) -> int:
+		"""
+		Sets plan_name on every unexpired subscription whose plan is missing or empty, in a single update_many.
+		Older rows store period_end as a "%Y-%m-%dT%H:%M:%SZ" string, which sorts chronologically, so those
+		are matched against the same string form of now.
+
+		Returns:
+			int: The number of subscriptions updated
+		"""
+		now = datetime.now()
+		result = collection.update_many(
+			{
+				"$and": [
+					{"$or": [
+						{"period_end": {"$gt": now}},
+						{"period_end": {"$gt": now.strftime("%Y-%m-%dT%H:%M:%SZ")}},
+					]},
+					{"$or": [{"plan_name": None}, {"plan_name": ""}]},
+				]
+			},
+			{"$set": {
+				"plan_name": plan_name,
+				"updated_at": now
+			}}
+		)
+		return result.modified_count
+
+	@staticmethod
+	def count_inactive_subscriptions() -> int:
+		"""
+		Counts subscriptions without a period_end or whose period_end has passed, i.e. the rows
+		set_plan_for_active_subscriptions_without_plan never considers. Matches both period_end forms the same way.
+		"""
+		now = datetime.now()
+		return collection.count_documents({
+			"$or": [
+				{"period_end": None},
+				{"period_end": ""},
+				{"period_end": {"$lte": now}},
+				{"period_end": {"$lte": now.strftime("%Y-%m-%dT%H:%M:%SZ")}},
+			]
+		})
+
+	@staticmethod
+	@invalidates_subscription_cache
 	def update_after_plan_change(subscription_id: str, stripe_subscription: dict, plan_name: str):
 		"""
 		Updates a subscription after changing the plan, updating both the plan name
@@ -414,6 +638,7 @@ class ConstellaSubscription:
 			return False
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def set_embedded_bodies_status(subscription_id: str, status: str):
 		"""
 		Updates the embedded_bodies_status for a subscription.
@@ -443,6 +668,7 @@ class ConstellaSubscription:
 			return False
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def update_period_end(subscription_id: str, new_period_end: datetime):
 		"""
 		Updates the period_end for a subscription.
@@ -472,6 +698,7 @@ class ConstellaSubscription:
 			return False
 
 	@staticmethod
+	@invalidates_subscription_cache
 	def cancel_immediately_user_subscription(subscription_id: str):
 		"""
 		Cancels a subscription immediately by setting period_end to null and plan_name to empty string.
@@ -500,3 +727,32 @@ class ConstellaSubscription:
 			print(f"Error canceling subscription immediately: {str(e)}")
 			traceback.print_exc()
 			return False
+
+	@staticmethod
+	@invalidates_subscription_cache
+	def bulk_cancel_immediately(subscription_ids: list):
+		"""
+		Same as cancel_immediately_user_subscription for many subscriptions, in a single write.
+		
+		Args:
+			subscription_ids: The IDs of the subscriptions to cancel immediately
+			
+		Returns:
+			int: Number of subscriptions modified
+		"""
+		if not subscription_ids:
+			return 0
+		try:
+			result = collection.update_many(
+				{"_id": {"$in": [ObjectId(subscription_id) for subscription_id in subscription_ids]}},
+				{"$set": {
+					"period_end": None,
+					"plan_name": "",
+					"updated_at": datetime.now()
+				}}
+			)
+			return result.modified_count
+		except Exception as e:
+			print(f"Error bulk canceling subscriptions immediately: {str(e)}")
+			traceback.print_exc()
+			return 0
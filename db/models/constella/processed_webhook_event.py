@@ -0,0 +1,45 @@
+from db.mongodb import db
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+
+collection = db['processed_webhook_events']
+
+# Providers retry for a few days at most, so older records can expire
+processed_event_ttl_seconds = 7 * 24 * 60 * 60
+
+try:
+	collection.create_index("processed_at", expireAfterSeconds=processed_event_ttl_seconds)
+except Exception as e:
+	print(f"Error creating processed_webhook_events TTL index: {e}")
+
+class ProcessedWebhookEvent:
+	"""
+	Record of webhook events (Stripe, RevenueCat) that were handled successfully,
+	so provider retries of the same event can be acknowledged without re-running side effects.
+	"""
+
+	@staticmethod
+	def _key(source: str, event_id: str):
+		return f"{source}:{event_id}"
+
+	@staticmethod
+	def is_processed(source: str, event_id: str) -> bool:
+		if not event_id:
+			return False
+		return collection.find_one({"_id": ProcessedWebhookEvent._key(source, event_id)}, {"_id": 1}) is not None
+
+	@staticmethod
+	def mark_processed(source: str, event_id: str, event_type: str = None):
+		"""Call only after the event was handled, so a crash mid-way still lets the provider retry"""
+		if not event_id:
+			return
+		try:
+			collection.insert_one({
+				"_id": ProcessedWebhookEvent._key(source, event_id),
+				"source": source,
+				"type": event_type,
+				"processed_at": datetime.utcnow(),
+			})
+		except DuplicateKeyError:
+			# A concurrent retry finished first
+			pass
@@ -1,7 +1,7 @@
 import os
 import time
 import traceback
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 from pymongo.read_preferences import ReadPreference
 from pymongo.errors import ServerSelectionTimeoutError, AutoReconnect, ConnectionFailure
 from dotenv import load_dotenv
@@ -20,6 +20,10 @@ _db = None
 db = None
 client = None
 
+# Async client for event loop routes, created on first use so it binds to the running loop
+_async_client = None
+_async_db = None
+
 
 def get_client():
     """Lazy initialization of MongoDB client"""
@@ -57,6 +61,41 @@ def get_db():
     return _db
 
 
+def get_async_db():
+    """
+    Lazy initialization of the async MongoDB database (PyMongo's native asyncio API).
+    Must be called from inside the event loop; async def routes await its queries
+    instead of holding a threadpool worker while Mongo responds.
+    """
+    global _async_client, _async_db
+    if _async_db is None and connection_string:
+        _async_client = AsyncMongoClient(
+            connection_string,
+            read_preference=ReadPreference.SECONDARY_PREFERRED,
+            serverSelectionTimeoutMS=60000,
+            connectTimeoutMS=30000,
+            socketTimeoutMS=30000,
+            maxPoolSize=50,  # Coroutines share the pool, so it can be larger than the threaded one
+            minPoolSize=1,
+            maxIdleTimeMS=300000,
+            retryWrites=True,
+            retryReads=True,
+            w='majority',
+            wtimeoutMS=10000,
+        )
+        _async_db = _async_client['main']
+    return _async_db
+
+
+async def close_async_client():
+    """Close the async MongoDB client if it was created"""
+    global _async_client, _async_db
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+        _async_db = None
+
+
 def create_mongodb_client():
     """Create a MongoDB client with robust configuration for replica set issues"""
 
@@ -8,11 +8,13 @@ import logging
 import sentry_sdk
 from constants import is_dev, is_scheduler
 from utils.encryption import decrypt_request
+from utils.logger import setup_queue_logging
 import jwt
 from db.weaviate.weaviate_client import client
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 from user_agents import parse
@@ -24,6 +26,9 @@ import os
 # Load environment variables from .env file
 load_dotenv()
 
+# Log records are queued and written by a background thread so logging never blocks the event loop
+log_listener = setup_queue_logging()
+
 # from db.milvus.milvus_client import client as milvus_client
 
 
@@ -121,6 +126,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (PDF text, integration dicts, deletion summaries); small bodies are sent as is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 secret_key = os.getenv("JWT_SECRET")
 
 
@@ -234,8 +242,26 @@ async def shutdown_event():
     try:
         if not is_scheduler:
             client.close()
+            from routers.misc.helpers import pdf_http_client
+            await pdf_http_client.aclose()
+            from routers.integrations import arcade_http_client
+            await arcade_http_client.aclose()
+            from routers.stella import stella_http_client
+            await stella_http_client.aclose()
+            from ai.stella.assistants.tools.tool_implementations import website_http_client
+            await website_http_client.aclose()
+            from ai.stella.v2.cerebras_sonic import openrouter_http_client
+            await openrouter_http_client.aclose()
+            from ai.orb.llms.openrouter import openrouter_stream_http_client
+            await openrouter_stream_http_client.aclose()
+            from ai.ai_api import stream_pump_executor
+            stream_pump_executor.shutdown(wait=False, cancel_futures=True)
+            from db.mongodb import close_async_client
+            await close_async_client()
     except Exception as e:
         print(f"Error during graceful shutdown: {e}")
+    finally:
+        log_listener.stop()
 
 # Handle unexpected shutdowns gracefully
 
@@ -272,6 +298,7 @@ NOISY_LOGGERS = [
     "fastapi.ws_rpc",          # fastapi-websocket-rpc + pubsub wrapper
     "broadcaster",             # redis / kafka / postgres backend driver
     "aioredis",                # the Redis client used by broadcaster
+    "httpx",                   # logs every request at INFO
 ]
 
 for name in NOISY_LOGGERS:
@@ -1,8 +1,11 @@
 from datetime import datetime
 import json
 import asyncio  # <- for task management/cancellation support
-from ai.orb.prompts import (get_execute_screen_system_prompt, get_orb_system_prompt,
-	orb_system_prompt, parse_orb_frontend_messages)
+from contextlib import aclosing
+from collections import OrderedDict
+from hashlib import blake2b
+from ai.orb.prompts import (convert_openai_to_anthropic, get_orb_system_prompt,
+	get_screen_execute_session_system_prompt, orb_system_prompt, parse_orb_frontend_messages)
 from utils.notifs import send_ios_image_notification
 from weaviate.exceptions import UnexpectedStatusCodeError
 import fastapi
@@ -20,7 +23,7 @@ from db.weaviate.operations.general import (delete_all_records, delete_record,
 from ai.embeddings import create_embedding, create_file_embedding, get_image_to_text
 from db.weaviate.records.note import WeaviateNote
 from db.models.constella.long_job import LongJob
-from constants import default_query_limit, image_note_prefix
+from constants import default_query_limit, image_note_prefix, is_dev
 from utils.constella.files.file_base64 import clean_base64
 from utils.constella.files.s3.s3 import (get_file_url_from_path, get_signed_file_url,
 	upload_file_bytes_to_s3, remove_signed_params_from_url)
@@ -29,14 +32,16 @@ from utils.constella.files.s3.s3_file_management import cloudfront_url_prefix
 from ai.vision.images import (format_ocr_json_to_string, image_matches_instruction,
 	openai_ocr_image_to_text)
 from ai.stella.prompts import get_system_prompt
-from ai.ai_api import (openai_tool_calls, stream_anthropic_response,
+from ai.ai_api import (iterate_stream_in_thread, openai_tool_calls, stream_anthropic_response,
 	stream_google_response, stream_openai_response)
 from fastapi import WebSocket, WebSocketDisconnect
 from ai.horizon.assist_ai import get_horizon_system_prompt, parse_horizon_frontend_messages, convert_anthropic_to_google
 from ai.orb.tools_openai import get_orb_tools
-from ai.orb.llms.openrouter import stream_openrouter_response, openrouter_parse_orb_frontend_messages  # NEW IMPORT
+from ai.orb.llms.openrouter import (stream_openrouter_response, stream_openrouter_response_chunks,
+	openrouter_parse_orb_frontend_messages, openrouter_error_response)
 from ai.orb.tools_cerebras import get_cerebras_orb_tools, get_screen_execute_cerebras_orb_tools
 from ai.orb.debug import write_messages_to_file
+from utils.websockets.fast_json import receive_orjson, send_orjson
 
 
 
@@ -47,6 +52,95 @@ router = APIRouter(
 	# responses={404: {"description": "Not found"}},
 )
 
+# Metric evaluation responses cached by a hash of their inputs, so unchanged
+# frames (e.g. the user idling on a screen) skip the OpenRouter round trip.
+# Only used with a deterministic temperature, otherwise caching changes behavior.
+metric_eval_temperature = 0
+max_metric_eval_cache_entries = 512
+_metric_eval_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def to_stable_json(value) -> str:
+	"""Serialize prompt data byte-identically across frames so provider prefix caching can hit"""
+	return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+# Screen-execute conversation history is bounded so per-frame prompt size stays constant
+max_screen_execute_history_turns = 6
+max_screen_execute_history_chars = 32000
+
+
+def compact_screen_execute_history(history: list) -> list:
+	"""Drop the oldest user/assistant pairs until the history fits the turn and character budgets"""
+	total_chars = sum(len(message["content"]) for message in history)
+	while history and (len(history) > max_screen_execute_history_turns * 2 or total_chars > max_screen_execute_history_chars):
+		removed = history[:2]
+		history = history[2:]
+		total_chars -= sum(len(message["content"]) for message in removed)
+	return history
+
+
+def get_screen_execute_frame_signature(image_bytes, ocr_results, actions_done, goal, metric_to_track, description_of_screen) -> str:
+	"""Hash everything a screen-execute decision depends on, to detect duplicate frames"""
+	signature = blake2b(digest_size=16)
+	if image_bytes:
+		signature.update(image_bytes.encode() if isinstance(image_bytes, str) else image_bytes)
+	signature.update(b"|")
+	signature.update(to_stable_json([ocr_results, actions_done, goal, metric_to_track, description_of_screen]).encode())
+	return signature.hexdigest()
+
+
+def get_metric_eval_cache_key(goal, metric_to_track, description_of_screen, ocr_results, recent_actions, previous_evaluation) -> str:
+	"""Hash all inputs of the metric evaluation prompt into a compact cache key"""
+	payload = to_stable_json([goal, metric_to_track, description_of_screen, ocr_results, recent_actions, previous_evaluation])
+	return blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def get_cached_metric_evaluation(key: str) -> Optional[str]:
+	"""Return the cached evaluation for key (marking it recently used) or None"""
+	evaluation = _metric_eval_cache.get(key)
+	if evaluation is not None:
+		_metric_eval_cache.move_to_end(key)
+	return evaluation
+
+
+def cache_metric_evaluation(key: str, evaluation: str):
+	"""Store an evaluation, evicting the least recently used entries past the limit"""
+	_metric_eval_cache[key] = evaluation
+	_metric_eval_cache.move_to_end(key)
+	while len(_metric_eval_cache) > max_metric_eval_cache_entries:
+		_metric_eval_cache.popitem(last=False)
+
+
+class ScreenExecuteFrameRecorder:
+	"""
+	Stands in for the websocket during a screen-execute frame: sends go straight through and are also
+	kept, so a duplicate frame can be answered by replaying exactly what the original frame sent
+	"""
+
+	def __init__(self, websocket: WebSocket):
+		self.websocket = websocket
+		self.sent: list[tuple[str, object]] = []
+
+	@property
+	def client_state(self):
+		return self.websocket.client_state
+
+	async def send_text(self, data: str):
+		self.sent.append(("text", data))
+		await self.websocket.send_text(data)
+
+	async def send_json(self, data):
+		self.sent.append(("json", data))
+		await self.websocket.send_json(data)
+
+	async def replay(self, sent: list[tuple[str, object]]):
+		for kind, data in sent:
+			if kind == "text":
+				await self.websocket.send_text(data)
+			else:
+				await self.websocket.send_json(data)
+
 
 @router.websocket("/orb-ws")
 async def websocket_orb_endpoint(websocket: WebSocket):
@@ -63,7 +157,7 @@ async def websocket_orb_endpoint(websocket: WebSocket):
 			# Wait for incoming message
 			# -----------------------------
 			try:
-				req = await websocket.receive_json()
+				req = await receive_orjson(websocket)
 			except Exception as e:
 				print("Orb receiving JSON payload over websocket:", e)
 				try:
@@ -97,7 +191,7 @@ async def websocket_orb_endpoint(websocket: WebSocket):
 		print('Error in horizon assist chat request: ', e)
 		traceback.print_exc()
 		try:
-			await websocket.send_json({"error": str(e)})
+			await send_orjson(websocket, {"error": str(e)})
 		except Exception:
 			pass
 	finally:
@@ -119,6 +213,7 @@ async def _handle_orb_generation(req: dict, websocket: WebSocket):
 	ensure the OpenAI stream is also closed to free resources.
 	"""
 	stream = None
+	messages = None
 	try:
 		# Extract options
 		image_bytes = req.get('imageBytes')
@@ -138,8 +233,9 @@ async def _handle_orb_generation(req: dict, websocket: WebSocket):
 			from_suggestion=from_suggestion
 		)
 
-		# -------- Call OpenAI and begin streaming --------
-		stream = openai_tool_calls(
+		# -------- Call OpenAI and begin streaming (off the event loop) --------
+		stream = await asyncio.to_thread(
+			openai_tool_calls,
 			messages,
 			max_tokens=req.get('max_tokens', 1024),
 			system_prompt=get_orb_system_prompt(messages, about_user=about_user, user_instructions=user_instructions, user_mode=user_mode, orb_tapped_to_hold=orb_tapped_to_hold),
@@ -152,70 +248,69 @@ async def _handle_orb_generation(req: dict, websocket: WebSocket):
 		has_tool_call = False
 		has_streamed_normal_text = False
 
-		for event in stream:
-			# Yield control regularly so cancellation can propagate
-			await asyncio.sleep(0)
-			etype = getattr(event, "type", "")
-
-			# 1. Plain text deltas
-			if etype == "response.output_text.delta" and not has_tool_call:
-				await websocket.send_text(getattr(event, "delta", ""))
-				has_streamed_normal_text = True
-				continue
-
-			if has_streamed_normal_text:
-				continue
-
-			# Helper to safely extract dicts
-			item = getattr(event, "item", None)
-			item_type = ""
-			if item is not None:
-				item_type = getattr(item, "type", "") or (item.get("type") if isinstance(item, dict) else "")
-
-			# a) new function call added
-			if etype == "response.output_item.added" and item_type == "function_call":
-				has_tool_call = True
-				idx = getattr(event, "output_index", 0)
-				chunk = tool_call_chunks.setdefault(idx, {
-					"id": getattr(item, "id", "") if not isinstance(item, dict) else item.get("id", ""),
-					"type": "tool_call",
-					"function": {
-						"name": getattr(item, "name", "") if not isinstance(item, dict) else item.get("name", ""),
-						"arguments": ""
-					}
-				})
-				continue
-
-			# c) final full arguments string
-			if etype == "response.function_call_arguments.done":
-				idx = getattr(event, "output_index", 0)
-				chunk = tool_call_chunks.setdefault(idx, {
-					"id": getattr(event, "item_id", ""),
-					"type": "tool_call",
-					"function": {"name": "", "arguments": ""}
-				})
-				chunk["function"]["arguments"] = getattr(event, "arguments", chunk["function"].get("arguments", ""))
-				break
-
-			# 3. legacy events
-			if etype in ("response.tool_calls", "response.tool_calls.delta"):
-				has_tool_call = True
-				for tc in getattr(event, "tool_calls", []):
-					idx = getattr(tc, "index", 0)
-					chunk = tool_call_chunks.setdefault(idx, {"id": "", "type": "tool_call", "function": {"name": "", "arguments": ""}})
-					if tc.id:
-						chunk["id"] = tc.id
-					if tc.function.name:
-						chunk["function"]["name"] = tc.function.name
-					if tc.function.arguments:
-						chunk["function"]["arguments"] += tc.function.arguments
-				continue
+		async with aclosing(iterate_stream_in_thread(stream)) as events:
+			async for event in events:
+				etype = getattr(event, "type", "")
+
+				# 1. Plain text deltas
+				if etype == "response.output_text.delta" and not has_tool_call:
+					await websocket.send_text(getattr(event, "delta", ""))
+					has_streamed_normal_text = True
+					continue
+
+				if has_streamed_normal_text:
+					continue
+
+				# Helper to safely extract dicts
+				item = getattr(event, "item", None)
+				item_type = ""
+				if item is not None:
+					item_type = getattr(item, "type", "") or (item.get("type") if isinstance(item, dict) else "")
+
+				# a) new function call added
+				if etype == "response.output_item.added" and item_type == "function_call":
+					has_tool_call = True
+					idx = getattr(event, "output_index", 0)
+					chunk = tool_call_chunks.setdefault(idx, {
+						"id": getattr(item, "id", "") if not isinstance(item, dict) else item.get("id", ""),
+						"type": "tool_call",
+						"function": {
+							"name": getattr(item, "name", "") if not isinstance(item, dict) else item.get("name", ""),
+							"arguments": ""
+						}
+					})
+					continue
+
+				# c) final full arguments string
+				if etype == "response.function_call_arguments.done":
+					idx = getattr(event, "output_index", 0)
+					chunk = tool_call_chunks.setdefault(idx, {
+						"id": getattr(event, "item_id", ""),
+						"type": "tool_call",
+						"function": {"name": "", "arguments": ""}
+					})
+					chunk["function"]["arguments"] = getattr(event, "arguments", chunk["function"].get("arguments", ""))
+					break
+
+				# 3. legacy events
+				if etype in ("response.tool_calls", "response.tool_calls.delta"):
+					has_tool_call = True
+					for tc in getattr(event, "tool_calls", []):
+						idx = getattr(tc, "index", 0)
+						chunk = tool_call_chunks.setdefault(idx, {"id": "", "type": "tool_call", "function": {"name": "", "arguments": ""}})
+						if tc.id:
+							chunk["id"] = tc.id
+						if tc.function.name:
+							chunk["function"]["name"] = tc.function.name
+						if tc.function.arguments:
+							chunk["function"]["arguments"] += tc.function.arguments
+					continue
 
 		# After stream finishes
 		if has_tool_call:
 			tool_calls_response = list(tool_call_chunks.values())
 			print('forwarding tool call: ', tool_calls_response)
-			await websocket.send_json({"tool_calls": tool_calls_response})
+			await send_orjson(websocket, {"tool_calls": tool_calls_response})
 
 	except asyncio.CancelledError:
 		# Task was cancelled by client – ensure OpenAI streaming is closed
@@ -229,15 +324,19 @@ async def _handle_orb_generation(req: dict, websocket: WebSocket):
 		print('Error in stream orb response: ', e)
 		# Try anthropic as a backup if OpenAI fails (only if not cancelled)
 		try:
-			messages = parse_horizon_frontend_messages(
-				req['messages'],
-				model="anthropic",
-				image_bytes=None
-			)
+			# Reuse the already parsed messages (including the screenshot) when available
+			if messages:
+				anthropic_messages = convert_openai_to_anthropic(messages)
+			else:
+				anthropic_messages = parse_horizon_frontend_messages(
+					req['messages'],
+					model="anthropic",
+					image_bytes=None
+				)
 			for word in stream_anthropic_response(
-				messages,
+				anthropic_messages,
 				max_tokens=req.get('max_tokens', 1024),
-				system_prompt=get_horizon_system_prompt(messages)
+				system_prompt=get_horizon_system_prompt(anthropic_messages)
 			):
 				await websocket.send_text(word)
 		except Exception as backup_e:
@@ -262,7 +361,9 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 	description_of_screen = None
 	metric_progress_history = []
 	actions_done: list[dict] = []  # Track actions executed so far
-	messages = []
+	history: list[dict] = []  # Committed user/assistant turns, compacted after every frame
+	last_frame_signature = None  # Signature of the last frame that got a decision
+	last_frame_sent = None  # Everything that frame sent to the client (tool calls, metric progress)
 	
 	try:
 		print('HORIZON ORB SCREEN EXECUTE WS RECEIVED')
@@ -270,7 +371,7 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 		while True:
 			# Receive request from the WebSocket connection and handle malformed JSON gracefully
 			try:
-				req = await websocket.receive_json()
+				req = await receive_orjson(websocket)
 			except Exception as e:
 				print("Orb Ws Screen Execute receiving JSON payload over websocket:", e)
 				try:
@@ -296,14 +397,14 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 				print('INIT MESSAGE RECEIVED')
 
 			try:
+				# Frame sends go through the recorder so a duplicate next frame can replay them
+				frame_recorder = ScreenExecuteFrameRecorder(websocket)
+
 				# Extra arguments passed to each tool implementation
 				extra_args = {
-					"websocket_tool_io": websocket,
+					"websocket_tool_io": frame_recorder,
 				}
 
-				# Extract image_bytes from top-level request
-				image_bytes = req.get('imageBytes')
-
 				# Update actions_done list if present in the request
 				action_type = req.get('actionDone') or req.get('action_done')
 				action_data = req.get('actionData') or req.get('action_data')
@@ -313,12 +414,37 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 					if len(actions_done) > 20:
 						actions_done = actions_done[-20:]
 
+				# Identical consecutive frames (same screen, OCR, actions and session context) get the
+				# previous decision back without any LLM call. A new action changes the signature,
+				# which invalidates the cached decision. The replay is exactly what the original frame sent.
+				frame_signature = get_screen_execute_frame_signature(
+					req.get('imageBytes'), req.get('ocr_results'), actions_done,
+					goal, metric_to_track, description_of_screen
+				)
+				if frame_signature == last_frame_signature and last_frame_sent is not None:
+					await frame_recorder.replay(last_frame_sent)
+					continue
+
+				# Previous evaluation is used by both calls so they can run concurrently
+				previous_metric_evaluation = metric_progress_history[-1]['evaluation'] if metric_progress_history else None
+
 				# -------------------------------------------------
-				# 1. Metric evaluation BEFORE main decision
+				# 1. Build metric evaluation request
 				# -------------------------------------------------
-				latest_metric_evaluation = None
-				if metric_to_track:
+				async def evaluate_metric():
+					if not metric_to_track:
+						return None
 					try:
+						cache_key = None
+						if metric_eval_temperature == 0:
+							cache_key = get_metric_eval_cache_key(
+								goal, metric_to_track, description_of_screen,
+								req.get('ocr_results'), actions_done[-5:], previous_metric_evaluation
+							)
+							cached_evaluation = get_cached_metric_evaluation(cache_key)
+							if cached_evaluation is not None:
+								return cached_evaluation
+
 						metric_eval_messages = [
 							{
 								"role": "user",
@@ -328,97 +454,114 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 								Goal: {goal or 'Not specified'}
 								Metric to Track: {metric_to_track}
 								Description of screen: {description_of_screen}
-								Recent Actions: {actions_done[-5:]}
-								Previous Progress: {metric_progress_history[-1]['evaluation'] if metric_progress_history else 'No previous progress'}
-								OCR of list of strings on the screen: {req.get('ocr_results')}
+								Recent Actions: {to_stable_json(actions_done[-5:])}
+								Previous Progress: {previous_metric_evaluation or 'No previous progress'}
+								OCR of list of strings on the screen: {to_stable_json(req.get('ocr_results'))}
 								
 								Return your assessment in the format "PROGRESS: [score] - [assessment]" (score 0-100, 1 sentence assessment).
 								"""
 							}
 						]
 
-						latest_metric_evaluation = await stream_openrouter_response(
+						evaluation = await stream_openrouter_response(
 							messages=metric_eval_messages,
+							temperature=metric_eval_temperature,
 							extra_args={},
 							system_prompt="You are a progress evaluator. Provide concise metric assessments.",
 							tools=None
 						)
 
-						if latest_metric_evaluation and "PROGRESS:" in latest_metric_evaluation:
-							timestamp = datetime.now().isoformat()
-							metric_progress_history.append({
-								"timestamp": timestamp,
-								"evaluation": latest_metric_evaluation.strip(),
-							})
-							# keep last 10
-							if len(metric_progress_history) > 10:
-								metric_progress_history = metric_progress_history[-10:]
-
-							# Send progress update to client
-							await websocket.send_text(f"|METRIC_PROGRESS:|{latest_metric_evaluation}")
+						# Only cache well-formed evaluations so errors are retried next frame
+						if cache_key and evaluation and "PROGRESS:" in evaluation:
+							cache_metric_evaluation(cache_key, evaluation)
+						return evaluation
 					except Exception as e:
 						print(f'Error evaluating metric progress: {e}')
+						return None
 
 				# -------------------------------------------------
-				# 2. Build extra prompt with latest info
+				# 2. Build extra prompt with latest per-frame info
+				# Goal, metric and screen description live in the session system prompt, so the
+				# system prompt + tools prefix stays identical (and cacheable) across frames
 				# -------------------------------------------------
 				extra_prompt_parts = []
-				if goal:
-					extra_prompt_parts.append(f"GOAL: {goal}")
-				if metric_to_track:
-					extra_prompt_parts.append(f"METRIC TO TRACK: {metric_to_track}")
-				if description_of_screen:
-					extra_prompt_parts.append(f"INITIAL SCREEN DESCRIPTION (to help decide what elements to interact with, may have changed): {description_of_screen}")
-				if latest_metric_evaluation:
-					extra_prompt_parts.append(f"LATEST METRIC EVALUATION: {latest_metric_evaluation.strip()}")
+				if previous_metric_evaluation:
+					extra_prompt_parts.append(f"LATEST METRIC EVALUATION: {previous_metric_evaluation}")
 				if actions_done:
-					extra_prompt_parts.append(f"ACTIONS DONE SO FAR (do not do them again): {actions_done}")
+					extra_prompt_parts.append(f"ACTIONS DONE SO FAR (do not do them again): {to_stable_json(actions_done)}")
 				
 				if req.get('ocr_results'):
-					extra_prompt_parts.append(f"The current OCR on the screen, a list of detected texts. When deciding an action to click, return one of the texts exactly from the list: {req.get('ocr_results')}")
+					extra_prompt_parts.append(f"The current OCR on the screen, a list of detected texts. When deciding an action to click, return one of the texts exactly from the list: {to_stable_json(req.get('ocr_results'))}")
 
 				extra_prompt = "\n".join(extra_prompt_parts)
 
-				# Add the extra prompt to the messages
-				messages.append({
-					"role": "user",
-					"content": ""
-				})
-
-				
-				print('\n\n')
-				print('INPUT MESSAGES:')
-				print(messages)
-				print('\n\n')
+				# Full message dumps are O(prompt size) per frame, so only log them in dev
+				if is_dev:
+					print('\n\n')
+					print('INPUT MESSAGES:')
+					print(history)
+					print('\n\n')
+				else:
+					print(f"Screen execute frame: {len(history)} history messages, {len(extra_prompt)} extra prompt chars")
 				
 				# -------------------------------------------------
-				# 3. Parse messages & get main decision
+				# 3. Parse messages & run metric eval + main decision concurrently
+				# The in-flight user turn carries the extra prompt; committed history is left untouched
 				# -------------------------------------------------
+				# The screenshot is not forwarded: the Cerebras models only get the OCR text,
+				# so the frame's imageBytes is never re-encoded or re-processed here
 				messages = openrouter_parse_orb_frontend_messages(
-					messages,
-					image_bytes=image_bytes,
+					history + [{"role": "user", "content": ""}],
 					screen_execute_mode=True,
 					extra_prompt=extra_prompt
 				)
 
-				message_resp = await stream_openrouter_response(
-					messages=messages,
-					extra_args=extra_args,
-					system_prompt=get_execute_screen_system_prompt(),
-					tools=get_screen_execute_cerebras_orb_tools(),
-					multi_turn_mode=False,
-					parallel_tool_calls=False
+				latest_metric_evaluation, message_resp = await asyncio.gather(
+					evaluate_metric(),
+					stream_openrouter_response(
+						messages=messages,
+						extra_args=extra_args,
+						system_prompt=get_screen_execute_session_system_prompt(goal, metric_to_track, description_of_screen),
+						tools=get_screen_execute_cerebras_orb_tools(),
+						multi_turn_mode=False,
+						parallel_tool_calls=False
+					)
 				)
 
+				if latest_metric_evaluation and "PROGRESS:" in latest_metric_evaluation:
+					timestamp = datetime.now().isoformat()
+					metric_progress_history.append({
+						"timestamp": timestamp,
+						"evaluation": latest_metric_evaluation.strip(),
+					})
+					# keep last 10
+					if len(metric_progress_history) > 10:
+						metric_progress_history = metric_progress_history[-10:]
+
+					# Send progress update to client
+					await frame_recorder.send_text(f"|METRIC_PROGRESS:|{latest_metric_evaluation}")
+
 				print("AI response: ", message_resp)
 
+				# A real decision is model text or a tool call sent to the client (tool-only turns return None).
+				# Failures are not cached, so an identical next frame retries the LLM instead of replaying them
+				is_decision = message_resp != openrouter_error_response and (
+					message_resp is not None or any(kind == "json" for kind, _ in frame_recorder.sent)
+				)
+				if is_decision:
+					last_frame_signature = frame_signature
+					last_frame_sent = frame_recorder.sent
+				else:
+					last_frame_signature = None
+					last_frame_sent = None
+
 				if message_resp is None:
 					message_resp = "Sorry, I couldn't generate a response at this time."
-				
-				messages.append({
-					"role": "assistant",
-					"content": message_resp
-				})
+
+				history = compact_screen_execute_history(history + [
+					messages[-1],
+					{"role": "assistant", "content": message_resp}
+				])
 
 				# await websocket.send_text("|TEXT_RESPONSE:|" + message_resp)
 				# await websocket.send_text('|DONE_STREAMING|')
@@ -427,7 +570,7 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 				print('Error in orb-ws-screen-execute response: ', e)
 				traceback.print_exc()
 				try:
-					await websocket.send_json({"error": str(e)})
+					await send_orjson(websocket, {"error": str(e)})
 				except Exception:
 					pass
 
@@ -437,7 +580,7 @@ async def websocket_orb_screen_execute_endpoint(websocket: WebSocket):
 		print('Error in horizon orb screen execute chat request: ', e)
 		traceback.print_exc()
 		try:
-			await websocket.send_json({"error": str(e)})
+			await send_orjson(websocket, {"error": str(e)})
 		except Exception:
 			pass
 	finally:
@@ -457,7 +600,7 @@ async def websocket_orb_fast_endpoint(websocket: WebSocket):
 		while True:
 			# Receive request from the WebSocket connection and handle malformed JSON gracefully
 			try:
-				req = await websocket.receive_json()
+				req = await receive_orjson(websocket)
 			except Exception as e:
 				print("Orb Ws Fast receiving JSON payload over websocket:", e)
 				try:
@@ -487,18 +630,21 @@ async def websocket_orb_fast_endpoint(websocket: WebSocket):
 				)
 
 
-				# Call the Cerebras-backed OpenRouter helper
-				message_resp = await stream_openrouter_response(
+				# Call the Cerebras-backed OpenRouter helper, forwarding text as it streams in
+				await websocket.send_text("|TEXT_RESPONSE:|")
+				has_streamed_text = False
+				async for chunk in stream_openrouter_response_chunks(
 					messages=messages,
 					extra_args=extra_args,
 					system_prompt=orb_system_prompt,
 					tools=get_cerebras_orb_tools(auto_execute=True)
-				)
+				):
+					await websocket.send_text(chunk)
+					has_streamed_text = True
 
-				if message_resp is None:
-					message_resp = "Sorry, I couldn't generate a response at this time."
+				if not has_streamed_text:
+					await websocket.send_text("Sorry, I couldn't generate a response at this time.")
 
-				await websocket.send_text("|TEXT_RESPONSE:|" + message_resp)
 				# Completion signal
 				await websocket.send_text('|DONE_STREAMING|')
 
@@ -506,7 +652,7 @@ async def websocket_orb_fast_endpoint(websocket: WebSocket):
 				print('Error in orb-ws-fast response: ', e)
 				traceback.print_exc()
 				try:
-					await websocket.send_json({"error": str(e)})
+					await send_orjson(websocket, {"error": str(e)})
 				except Exception:
 					pass
 
@@ -516,7 +662,7 @@ async def websocket_orb_fast_endpoint(websocket: WebSocket):
 		print('Error in horizon orb fast chat request: ', e)
 		traceback.print_exc()
 		try:
-			await websocket.send_json({"error": str(e)})
+			await send_orjson(websocket, {"error": str(e)})
 		except Exception:
 			pass
 	finally:
@@ -1,8 +1,11 @@
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import traceback
+import asyncio
+import logging
+import time
 import os
 import uuid
 
@@ -16,15 +19,18 @@ from db.models.constella.constella_auth import ConstellaAuth
 from db.models.constella.constella_integration import ConstellaIntegration
 from db.models.constella.long_job import LongJob
 from db.models.constella.constella_subscription import ConstellaSubscription
+from pymongo.errors import BulkWriteError
 
 # Utility imports
 from utils.loops import create_loops_contact, update_contact_property, send_event
 from utils.constella.files.s3.s3 import sign_url
 from utils.constella.syncing.integrations.readwise import fetch_from_export_api
 from utils.constella.syncing.integrations.integration_helper import sync_integrations_for_user
+from utils.constella.syncing.sync_executor import submit_sync_job
 
 # External APIs
-from arcadepy import Arcade
+from arcadepy import AsyncArcade
+import httpx
 
 # Constants
 SUPPORTED_INTEGRATIONS = {
@@ -33,7 +39,8 @@ SUPPORTED_INTEGRATIONS = {
 
 JOB_TYPES = {
     "INITIAL_SYNC": "initial_sync",
-    "SYNC_INTEGRATIONS": "sync_integrations"
+    "SYNC_INTEGRATIONS": "sync_integrations",
+    "ARCADE_AUTHORIZATION": "arcade_authorization"
 }
 
 JOB_STATUSES = {
@@ -44,27 +51,45 @@ JOB_STATUSES = {
 
 ARCADE_AUTH_STATUSES = {
     "COMPLETED": "completed",
-    "PENDING": "pending"
+    "PENDING": "pending",
+    "FAILED": "failed"
 }
 
+# Arcade authorization polling: exponential backoff from 1s, capped at 30s, give up after 10 minutes
+ARCADE_STATUS_POLL_INITIAL_SECONDS = 1
+ARCADE_STATUS_POLL_MAX_SECONDS = 30
+ARCADE_AUTHORIZATION_TIMEOUT_SECONDS = 600
+
 # Response messages
 MESSAGES = {
     "INTEGRATION_UPDATED": "Integration updated successfully",
     "INTEGRATION_REMOVED": "Integration removed",
     "AUTH_INITIATED": "Authorization initiated",
     "AUTH_COMPLETED": "Authorization completed", 
+    "AUTH_PENDING": "Waiting for authorization",
+    "AUTH_NOT_FOUND": "No Arcade authorization found",
+    "AUTH_FAILED": "Authorization failed",
     "SYNC_STARTED": "Sync started",
     "API_KEY_CREATION_FAILED": "Failed to create API key"
 }
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/integrations",
     tags=["integrations"],
+    # orjson encodes the nested integration dicts several times faster than stdlib json
+    default_response_class=ORJSONResponse,
     # dependencies=[Depends(validate_access_token)],
     # responses={404: {"description": "Not found"}},
 )
 
-arcade_client = Arcade()  # Uses ARCADE_API_KEY from env
+# Async client so Arcade round-trips do not block the event loop; the pooled httpx client
+# keeps TCP/TLS connections alive across calls
+arcade_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+)
+arcade_client = AsyncArcade(http_client=arcade_http_client)  # Uses ARCADE_API_KEY from env
 
 # Request Models
 class UpdateIntegrationRequest(BaseModel):
@@ -104,6 +129,11 @@ class WaitForArcadeAuthorizationRequest(BaseModel):
     integration_name: str
     user_id: str
 
+class ArcadeAuthorizationStatusRequest(BaseModel):
+    """Request model for reading the stored Arcade authorization status"""
+    integration_name: str
+    user_id: str
+
 class RemoveArcadeIntegrationRequest(BaseModel):
     """Request model for removing Arcade integrations"""
     integration_name: str
@@ -115,6 +145,7 @@ class IntegrationResponse(BaseModel):
     message: str
     status: Optional[str] = None
     authorization_url: Optional[str] = None
+    long_job_id: Optional[str] = None
 
 class SyncResponse(BaseModel):
     """Response model for sync operations"""
@@ -128,36 +159,28 @@ class ApiKeyResponse(BaseModel):
 # Helper Functions
 def get_current_timestamp_ms() -> int:
     """Get current timestamp in milliseconds"""
-    return int(datetime.utcnow().timestamp() * 1000)
-
-def safe_getattr(obj: Any, *attrs: str, default: Any = None) -> Any:
-    """Safely get nested attributes from an object"""
-    for attr in attrs:
-        if obj is None:
-            return default
-        obj = getattr(obj, attr, None)
-        if obj is None:
-            return default
-    return obj
+    return time.time_ns() // 1_000_000
 
 def extract_arcade_tool_metadata(tool: Any) -> Dict[str, Any]:
     """Extract metadata from Arcade tool object"""
-    requirements = safe_getattr(tool, "requirements")
-    authorization = safe_getattr(requirements, "authorization")
-    
+    # Bind the requirements / authorization nodes once, then read their leaf fields
+    # (getattr on a missing node still falls back to None)
+    requirements = getattr(tool, "requirements", None)
+    authorization = getattr(requirements, "authorization", None)
+
     return {
-        "requirements_met": safe_getattr(requirements, "met"),
-        "auth_status": safe_getattr(authorization, "status"),
-        "token_status": safe_getattr(authorization, "token_status"),
-        "provider": safe_getattr(authorization, "provider_type"),
-        "description": safe_getattr(tool, "description"),
+        "requirements_met": getattr(requirements, "met", None),
+        "auth_status": getattr(authorization, "status", None),
+        "token_status": getattr(authorization, "token_status", None),
+        "provider": getattr(authorization, "provider_type", None),
+        "description": getattr(tool, "description", None),
     }
 
 def create_arcade_auth_data(auth_response: Any) -> Dict[str, Any]:
     """Create initial Arcade auth data from response"""
     return {
-        "status": safe_getattr(auth_response, "status"),
-        "url": safe_getattr(auth_response, "url"),
+        "status": getattr(auth_response, "status", None),
+        "url": getattr(auth_response, "url", None),
     }
 
 def update_integration_with_arcade_data(user_id: str, integration_name: str, arcade_data: Dict[str, Any]) -> None:
@@ -169,36 +192,91 @@ def update_integration_with_arcade_data(user_id: str, integration_name: str, arc
         property_value=arcade_data,
     )
 
-def handle_completed_arcade_auth(user_id: str, integration_name: str) -> None:
-    """Handle completed Arcade authorization by fetching and storing tool details"""
+async def handle_completed_arcade_auth(user_id: str, integration_name: str) -> bool:
+    """Handle completed Arcade authorization by fetching and storing tool details. Returns success"""
     try:
-        tool = arcade_client.tools.get(
+        tool = await arcade_client.tools.get(
             tool_name=integration_name,
             user_id=user_id,
         )
         tool_metadata = extract_arcade_tool_metadata(tool)
-        update_integration_with_arcade_data(user_id, integration_name, tool_metadata)
+        await run_in_threadpool(update_integration_with_arcade_data, user_id, integration_name, tool_metadata)
+        return True
     except Exception as e:
-        print(f"Error fetching tool details for {integration_name}: {e}")
+        logger.exception("Error fetching tool details for %s", integration_name)
+        return False
 
-def revoke_arcade_integration(user_id: str, integration_name: str) -> bool:
+async def revoke_arcade_integration(user_id: str, integration_name: str) -> bool:
     """Attempt to revoke Arcade integration (best effort)"""
     try:
-        arcade_client.auth.revoke(
+        await arcade_client.auth.revoke(
             tool_name=integration_name,
             user_id=user_id,
         )
         return True
     except Exception as e:
-        print(f"Failed to revoke Arcade integration {integration_name}: {e}")
+        logger.warning("Failed to revoke Arcade integration %s: %s", integration_name, e)
         return False
 
 # Background Task Functions
+# Strong references to in-flight polling tasks so they are not garbage collected mid-run
+arcade_authorization_tasks = set()
+
+async def wait_for_arcade_completion(user_id: str, integration_name: str, auth_id: str, long_job_id: str) -> None:
+    """
+    Poll Arcade for the authorization status with exponential backoff and store the final status.
+    Runs on the event loop as a task; the blocking Mongo writes go through the threadpool.
+    """
+    async def finish(job_status: str, result: Dict[str, Any], arcade_data: Optional[Dict[str, Any]] = None) -> None:
+        # The integration's arcade data is what /arcade/status reports, so it always gets the final state
+        if arcade_data is not None:
+            await run_in_threadpool(update_integration_with_arcade_data, user_id, integration_name, arcade_data)
+        await run_in_threadpool(LongJob.update_status, long_job_id, job_status, result)
+
+    try:
+        delay = ARCADE_STATUS_POLL_INITIAL_SECONDS
+        deadline = asyncio.get_running_loop().time() + ARCADE_AUTHORIZATION_TIMEOUT_SECONDS
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, ARCADE_STATUS_POLL_MAX_SECONDS)
+
+            # A transient Arcade error only costs this attempt; keep backing off until the deadline
+            try:
+                auth_response = await arcade_client.auth.status(id=auth_id)
+            except Exception as e:
+                logger.warning("Error checking Arcade authorization %s for %s: %s", integration_name, user_id, e)
+                continue
+            auth_status = getattr(auth_response, "status", None)
+
+            if auth_status == ARCADE_AUTH_STATUSES["COMPLETED"]:
+                if await handle_completed_arcade_auth(user_id, integration_name):
+                    await finish(JOB_STATUSES["COMPLETED"], {"status": auth_status})
+                else:
+                    # Authorized, but the tool details could not be stored
+                    await finish(
+                        JOB_STATUSES["FAILED"],
+                        {"status": auth_status, "error": "Failed to fetch tool details"},
+                        create_arcade_auth_data(auth_response),
+                    )
+                return
+            if auth_status == ARCADE_AUTH_STATUSES["FAILED"]:
+                await finish(JOB_STATUSES["FAILED"], {"status": auth_status}, create_arcade_auth_data(auth_response))
+                return
+
+        await finish(
+            JOB_STATUSES["FAILED"],
+            {"error": "Timed out waiting for authorization"},
+            {"status": ARCADE_AUTH_STATUSES["FAILED"], "url": None},
+        )
+    except Exception as e:
+        logger.exception("Error polling Arcade authorization %s for %s", integration_name, user_id)
+        await finish(JOB_STATUSES["FAILED"], {"error": str(e)}, {"status": ARCADE_AUTH_STATUSES["FAILED"], "url": None})
+
 def sync_readwise_background(tenant_name: str, user_email: str, api_key: str, long_job_id: str) -> None:
     """Background task for syncing Readwise data"""
     try:
         fetch_from_export_api(tenant_name, api_key)
-        print(f"Readwise sync completed for user {user_email}")
+        logger.info("Readwise sync completed for user %s", user_email)
         
         # Update job status and integration timestamp
         LongJob.update_status(long_job_id, JOB_STATUSES["COMPLETED"])
@@ -210,8 +288,7 @@ def sync_readwise_background(tenant_name: str, user_email: str, api_key: str, lo
             last_updated_utc
         )
     except Exception as e:
-        traceback.print_exc()
-        print(f"Error syncing Readwise for user {user_email}: {e}")
+        logger.exception("Error syncing Readwise for user %s", user_email)
         LongJob.update_status(long_job_id, JOB_STATUSES["FAILED"], {"error": str(e)})
 
 def _serialize_integration(integ: Any) -> Dict[str, Any]:
@@ -244,8 +321,7 @@ async def get_user_integration(request: GetIntegrationRequest) -> Dict[str, Any]
         return {"integrations": {}}
         
     except Exception as e:
-        print(f"Error getting user integration for {request.user_email}: {e}")
-        traceback.print_exc()
+        logger.exception("Error getting user integration for %s", request.user_email)
         raise HTTPException(status_code=500, detail=f"Failed to get user integrations: {str(e)}")
 
 @router.post("/update")
@@ -263,10 +339,35 @@ async def update_user_integration(update_data: UpdateIntegrationRequest) -> Dict
         return {"message": MESSAGES["INTEGRATION_UPDATED"]}
         
     except Exception as e:
-        print(f"Error updating integration {update_data.integration_name} for {update_data.user_email}: {e}")
-        traceback.print_exc()
+        logger.exception("Error updating integration %s for %s", update_data.integration_name, update_data.user_email)
         raise HTTPException(status_code=500, detail=f"Failed to update integration: {str(e)}")
 
+@router.post("/bulk_update")
+async def bulk_update_user_integrations(updates: List[UpdateIntegrationRequest]) -> Dict[str, Any]:
+    """
+    Update many integration properties in one request and one database round-trip.
+    """
+    if not updates:
+        return {"updated": 0, "errors": []}
+
+    try:
+        result = ConstellaIntegration.bulk_update_integration_properties([
+            (update.user_email, update.integration_name, update.property_name, update.property_value)
+            for update in updates
+        ])
+        return {"updated": result.matched_count + result.upserted_count, "errors": []}
+
+    except BulkWriteError as e:
+        logger.exception("Error bulk updating integrations")
+        details = e.details or {}
+        return {
+            "updated": details.get("nMatched", 0) + details.get("nUpserted", 0),
+            "errors": [error.get("errmsg") for error in details.get("writeErrors", [])],
+        }
+    except Exception as e:
+        logger.exception("Error bulk updating integrations")
+        raise HTTPException(status_code=500, detail=f"Failed to bulk update integrations: {str(e)}")
+
 @router.post("/arcade/create", response_model=IntegrationResponse)
 async def arcade_create_integration(request: CreateArcadeIntegrationRequest) -> IntegrationResponse:
     """
@@ -274,65 +375,115 @@ async def arcade_create_integration(request: CreateArcadeIntegrationRequest) ->
     """
     try:
         # Initiate Arcade authorization
-        auth_response = arcade_client.tools.authorize(
+        auth_response = await arcade_client.tools.authorize(
             tool_name=request.integration_name,
             user_id=request.user_id,
         )
 
-        # Store initial auth status
-        arcade_data = create_arcade_auth_data(auth_response)
-        update_integration_with_arcade_data(request.user_id, request.integration_name, arcade_data)
-
-        # Handle completed authorization immediately
-        auth_status = safe_getattr(auth_response, "status")
-        if auth_status == ARCADE_AUTH_STATUSES["COMPLETED"]:
-            handle_completed_arcade_auth(request.user_id, request.integration_name)
+        # Completed authorizations store the tool details directly (one write);
+        # otherwise, or if fetching them fails, store the initial auth status
+        auth_status = getattr(auth_response, "status", None)
+        is_completed = auth_status == ARCADE_AUTH_STATUSES["COMPLETED"]
+        stored_tool_details = False
+        if is_completed:
+            stored_tool_details = await handle_completed_arcade_auth(request.user_id, request.integration_name)
+        if not stored_tool_details:
+            arcade_data = create_arcade_auth_data(auth_response)
+            update_integration_with_arcade_data(request.user_id, request.integration_name, arcade_data)
 
         # Build response
-        is_completed = auth_status == ARCADE_AUTH_STATUSES["COMPLETED"]
-        response = IntegrationResponse(
-            message=MESSAGES["AUTH_COMPLETED"] if is_completed else MESSAGES["AUTH_INITIATED"],
+        if is_completed:
+            return IntegrationResponse(message=MESSAGES["AUTH_COMPLETED"], status=auth_status)
+
+        return IntegrationResponse(
+            message=MESSAGES["AUTH_INITIATED"],
             status=auth_status,
+            authorization_url=arcade_data["url"],
         )
         
-        if not is_completed:
-            response.authorization_url = safe_getattr(auth_response, "url")
-
-        return response
-        
     except Exception as e:
-        print(f"Error creating Arcade integration {request.integration_name} for {request.user_id}: {e}")
-        traceback.print_exc()
+        logger.exception("Error creating Arcade integration %s for %s", request.integration_name, request.user_id)
         raise HTTPException(status_code=500, detail=f"Failed to create Arcade integration: {str(e)}")
 
 @router.post("/arcade/wait_for_authorization", response_model=IntegrationResponse)
 async def arcade_wait_for_authorization(request: WaitForArcadeAuthorizationRequest) -> IntegrationResponse:
     """
-    Wait for Arcade authorization completion (blocking operation).
+    Start waiting for Arcade authorization completion without holding the request open.
+    Returns a long job id immediately; poll /arcade/status (or the long job) for the result.
     """
     try:
         # Get fresh authorization response to wait on
-        auth_response = arcade_client.tools.authorize(
+        auth_response = await arcade_client.tools.authorize(
             tool_name=request.integration_name,
             user_id=request.user_id,
         )
-        
-        # Wait for completion (blocking call)
-        completed = arcade_client.auth.wait_for_completion(auth_response)
 
-        # Handle completed authorization
-        handle_completed_arcade_auth(request.user_id, request.integration_name)
+        # Already authorized, nothing to wait for
+        auth_status = getattr(auth_response, "status", None)
+        if auth_status == ARCADE_AUTH_STATUSES["COMPLETED"]:
+            await handle_completed_arcade_auth(request.user_id, request.integration_name)
+            return IntegrationResponse(
+                message=MESSAGES["AUTH_COMPLETED"],
+                status=auth_status,
+            )
+
+        long_job_id = await run_in_threadpool(
+            LongJob.insert,
+            JOB_STATUSES["STARTED"],
+            {},
+            JOB_TYPES["ARCADE_AUTHORIZATION"],
+            request.user_id
+        )
+
+        # Poll Arcade in the background with backoff
+        task = asyncio.create_task(wait_for_arcade_completion(
+            request.user_id,
+            request.integration_name,
+            getattr(auth_response, "id", None),
+            long_job_id
+        ))
+        arcade_authorization_tasks.add(task)
+        task.add_done_callback(arcade_authorization_tasks.discard)
 
         return IntegrationResponse(
-            message=MESSAGES["AUTH_COMPLETED"],
-            status=safe_getattr(completed, "status", ARCADE_AUTH_STATUSES["COMPLETED"]),
+            message=MESSAGES["AUTH_PENDING"],
+            status=ARCADE_AUTH_STATUSES["PENDING"],
+            authorization_url=getattr(auth_response, "url", None),
+            long_job_id=long_job_id,
         )
         
     except Exception as e:
-        print(f"Error waiting for Arcade authorization {request.integration_name} for {request.user_id}: {e}")
-        traceback.print_exc()
+        logger.exception("Error waiting for Arcade authorization %s for %s", request.integration_name, request.user_id)
         raise HTTPException(status_code=500, detail=f"Failed to wait for authorization: {str(e)}")
 
+@router.post("/arcade/status", response_model=IntegrationResponse)
+async def arcade_authorization_status(request: ArcadeAuthorizationStatusRequest) -> IntegrationResponse:
+    """
+    Read the stored Arcade authorization status for an integration. Does not call Arcade.
+    """
+    try:
+        # Uncached: the poll task that writes the final status may run in another worker process
+        integration = await run_in_threadpool(ConstellaIntegration.get_by_email, request.user_id, use_cache=False)
+        integ = integration.integrations.get(request.integration_name) if integration else None
+        arcade_data = getattr(integ, "arcade", None) or {}
+        if not arcade_data:
+            return IntegrationResponse(message=MESSAGES["AUTH_NOT_FOUND"])
+
+        # Completed auths store the tool metadata (auth_status), pending ones the initial auth data (status)
+        auth_status = arcade_data.get("auth_status") or arcade_data.get("status")
+        if auth_status == ARCADE_AUTH_STATUSES["FAILED"]:
+            return IntegrationResponse(message=MESSAGES["AUTH_FAILED"], status=auth_status)
+        is_completed = auth_status == ARCADE_AUTH_STATUSES["COMPLETED"]
+        return IntegrationResponse(
+            message=MESSAGES["AUTH_COMPLETED"] if is_completed else MESSAGES["AUTH_PENDING"],
+            status=auth_status,
+            authorization_url=None if is_completed else arcade_data.get("url"),
+        )
+
+    except Exception as e:
+        logger.exception("Error reading Arcade authorization status %s for %s", request.integration_name, request.user_id)
+        raise HTTPException(status_code=500, detail=f"Failed to get authorization status: {str(e)}")
+
 @router.post("/arcade/remove", response_model=IntegrationResponse)
 async def arcade_remove_integration(request: RemoveArcadeIntegrationRequest) -> IntegrationResponse:
     """
@@ -340,9 +491,9 @@ async def arcade_remove_integration(request: RemoveArcadeIntegrationRequest) ->
     """
     try:
         # Attempt to revoke in Arcade (best effort)
-        revoke_success = revoke_arcade_integration(request.user_id, request.integration_name)
+        revoke_success = await revoke_arcade_integration(request.user_id, request.integration_name)
         if not revoke_success:
-            print(f"Warning: Could not revoke Arcade integration {request.integration_name} for {request.user_id}")
+            logger.warning("Could not revoke Arcade integration %s for %s", request.integration_name, request.user_id)
 
         # Remove from database
         ConstellaIntegration.remove_integration(
@@ -353,15 +504,11 @@ async def arcade_remove_integration(request: RemoveArcadeIntegrationRequest) ->
         return IntegrationResponse(message=MESSAGES["INTEGRATION_REMOVED"])
         
     except Exception as e:
-        print(f"Error removing Arcade integration {request.integration_name} for {request.user_id}: {e}")
-        traceback.print_exc()
+        logger.exception("Error removing Arcade integration %s for %s", request.integration_name, request.user_id)
         raise HTTPException(status_code=500, detail=f"Failed to remove integration: {str(e)}")
 
 @router.post("/sync-initial-integration", response_model=SyncResponse)
-async def sync_initial_integration(
-    request: InitialSyncRequest, 
-    background_tasks: BackgroundTasks
-) -> SyncResponse:
+async def sync_initial_integration(request: InitialSyncRequest) -> SyncResponse:
     """
     Start initial sync for a supported integration.
     """
@@ -374,7 +521,7 @@ async def sync_initial_integration(
                 detail=f"Integration '{request.integration_name}' not supported. Supported: {supported}"
             )
 
-        # Create long job and start background sync
+        # Create long job and start the sync on the integration sync pool
         long_job_id = LongJob.insert(
             JOB_STATUSES["STARTED"], 
             {}, 
@@ -383,7 +530,7 @@ async def sync_initial_integration(
         )
         
         if request.integration_name == SUPPORTED_INTEGRATIONS["readwise"]:
-            background_tasks.add_task(
+            submit_sync_job(
                 sync_readwise_background,
                 request.tenant_name,
                 request.user_email,
@@ -399,20 +546,18 @@ async def sync_initial_integration(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error starting initial sync for {request.integration_name}: {e}")
-        traceback.print_exc()
+        logger.exception("Error starting initial sync for %s", request.integration_name)
         raise HTTPException(status_code=500, detail=f"Failed to start sync: {str(e)}")
 
 @router.post("/sync-integrations", response_model=SyncResponse)
 async def sync_integrations(
-    request: SyncIntegrationsRequest,
-    background_tasks: BackgroundTasks
+    request: SyncIntegrationsRequest
 ) -> SyncResponse:
     """
     Start sync for all user integrations.
     """
     try:
-        # Create long job and start background sync
+        # Create long job and start the sync on the integration sync pool
         long_job_id = LongJob.insert(
             JOB_STATUSES["STARTED"], 
             {}, 
@@ -420,7 +565,7 @@ async def sync_integrations(
             request.user_email
         )
         
-        background_tasks.add_task(
+        submit_sync_job(
             sync_integrations_for_user,
             request.tenant_name,
             request.user_email,
@@ -433,8 +578,7 @@ async def sync_integrations(
         )
         
     except Exception as e:
-        print(f"Error starting integrations sync for user {request.user_email}: {e}")
-        traceback.print_exc()
+        logger.exception("Error starting integrations sync for user %s", request.user_email)
         raise HTTPException(status_code=500, detail=f"Failed to start integrations sync: {str(e)}")
 
 @router.post("/create-api-key", response_model=ApiKeyResponse)
@@ -456,7 +600,6 @@ async def create_api_key(request: CreateApiKeyRequest) -> ApiKeyResponse:
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creating API key for user {request.auth_user_id}: {e}")
-        traceback.print_exc()
+        logger.exception("Error creating API key for user %s", request.auth_user_id)
         raise HTTPException(status_code=500, detail=f"Failed to create API key: {str(e)}")
 
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, WebSocketDisconnect, HTTPException, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
 
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Tuple
+from itertools import islice
+import asyncio
 import csv
 import io
 import os
@@ -9,19 +12,114 @@ import firebase_admin
 from firebase_admin import auth
 from db.weaviate.weaviate_client import delete_tenant
 from utils.constella.files.s3.s3 import delete_all_files_for_tenant
-import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
 	prefix="/admin",
 	tags=["admin"],
 )
 
+# Firebase Admin batch API limits
+firebase_get_users_batch_size = 100
+firebase_delete_users_batch_size = 1000
+# Max users whose S3 + Weaviate data is deleted at once
+tenant_data_deletion_concurrency = 16
+
 class DeleteAccountsResponse(BaseModel):
 	success_count: int
 	failed_emails: List[str]
 	errors: List[str]
 	s3_deletion_summary: dict
 
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+	"""Yield successive lists of at most size items, pulling lazily from any iterable"""
+	iterator = iter(items)
+	while chunk := list(islice(iterator, size)):
+		yield chunk
+
+def iter_csv_emails(csv_file_path: str) -> Iterator[str]:
+	"""Lazily yield normalized (stripped, lower case) emails from the first CSV column, skipping duplicates"""
+	seen = set()
+	with open(csv_file_path, 'r', newline='', encoding='utf-8') as file:
+		for row in csv.reader(file):
+			if not row:
+				continue
+			email = row[0].strip().lower()
+			if email and email not in seen:
+				seen.add(email)
+				yield email
+
+def get_firebase_uids_by_email(emails: List[str]) -> Tuple[Dict[str, str], List[str], Dict[str, str]]:
+	"""
+	Look up Firebase auth IDs for many emails with batched get_users calls.
+	Returns ({email: uid}, [emails not found], {invalid email: reason})
+	"""
+	uid_by_email = {}
+	not_found = []
+	invalid = {}
+	identifiers = []
+	# EmailIdentifier raises ValueError on malformed values (e.g. a CSV header row); one bad row must not
+	# fail the whole batch, so those are reported and skipped
+	for email in emails:
+		try:
+			identifiers.append(auth.EmailIdentifier(email))
+		except ValueError as e:
+			invalid[email] = str(e)
+
+	for identifier_chunk in chunked(identifiers, firebase_get_users_batch_size):
+		result = auth.get_users(identifier_chunk)
+		for user in result.users:
+			if user.email:
+				uid_by_email[user.email.lower()] = user.uid
+		not_found.extend(identifier.email for identifier in result.not_found)
+	return uid_by_email, not_found, invalid
+
+def delete_firebase_users(uid_by_email: Dict[str, str]) -> Dict[str, str]:
+	"""
+	Delete many Firebase users with batched delete_users calls.
+	Returns {email: reason} for the users that could not be deleted.
+	"""
+	failures = {}
+	for email_chunk in chunked(uid_by_email.keys(), firebase_delete_users_batch_size):
+		result = auth.delete_users([uid_by_email[email] for email in email_chunk])
+		for error in result.errors:
+			failures[email_chunk[error.index]] = error.reason
+	return failures
+
+async def delete_tenant_data(email: str, user_id: str, s3_deletion_summary: dict, semaphore: asyncio.Semaphore):
+	"""
+	Delete a user's S3 files and Weaviate tenant, running both in parallel.
+	Failures are recorded in s3_deletion_summary / printed so Firebase deletion still proceeds.
+	"""
+	async with semaphore:
+		s3_result, weaviate_result = await asyncio.gather(
+			run_in_threadpool(delete_all_files_for_tenant, user_id),
+			run_in_threadpool(delete_tenant, user_id),
+			return_exceptions=True
+		)
+
+	if isinstance(s3_result, Exception):
+		error_msg = f"Error deleting S3 files for {email} (user_id: {user_id}): {str(s3_result)}"
+		s3_deletion_summary['errors'].append(error_msg)
+		logger.error(error_msg)
+	else:
+		s3_deletion_summary['tenant_deletions'].append({
+			'tenant_id': user_id,
+			'email': email,
+			'files_deleted': s3_result.get('deleted_count', 0),
+			'success': s3_result.get('success', False),
+			'errors': s3_result.get('errors', [])
+		})
+		s3_deletion_summary['total_files_deleted'] += s3_result.get('deleted_count', 0)
+		if s3_result.get('errors'):
+			s3_deletion_summary['errors'].extend([f"{email}: {error}" for error in s3_result.get('errors', [])])
+
+	if isinstance(weaviate_result, Exception):
+		# Continue with Firebase deletion even if Weaviate fails
+		logger.error("Error deleting Weaviate tenant for %s and user_id %s: %s", email, user_id, weaviate_result)
+
 @router.post("/delete-accounts", response_model=DeleteAccountsResponse)
 async def delete_accounts():
 	"""
@@ -32,80 +130,65 @@ async def delete_accounts():
 		# Read the CSV file from root directory
 		csv_file_path = "emails.csv"
 
-		print("Deleting accounts")
+		logger.info("Deleting accounts")
 		
 		if not os.path.exists(csv_file_path):
 			raise HTTPException(status_code=404, detail="emails.csv file not found at root directory")
 		
-		with open(csv_file_path, 'r', encoding='utf-8') as file:
-			csv_reader = csv.reader(file)
-			
-			success_count = 0
-			failed_emails = []
-			errors = []
-			s3_deletion_summary = {
-				'total_files_deleted': 0,
-				'tenant_deletions': [],
-				'errors': []
-			}
-			
-			for row in csv_reader:
-				if not row or not row[0].strip():
-					continue
-					
-				email = row[0].strip()
-				
-				try:
-					# email lower case
-					email = email.lower()
-					
-					# Look up Firebase auth ID
-					user = auth.get_user_by_email(email)
-					user_id = user.uid
-					
-					# Delete S3 files for the tenant
-					try:
-						if user_id:
-							s3_result = delete_all_files_for_tenant(user_id)
-							s3_deletion_summary['tenant_deletions'].append({
-								'tenant_id': user_id,
-								'email': email,
-								'files_deleted': s3_result.get('deleted_count', 0),
-								'success': s3_result.get('success', False),
-								'errors': s3_result.get('errors', [])
-							})
-							s3_deletion_summary['total_files_deleted'] += s3_result.get('deleted_count', 0)
-							if s3_result.get('errors'):
-								s3_deletion_summary['errors'].extend([f"{email}: {error}" for error in s3_result.get('errors', [])])
-					except Exception as e:
-						error_msg = f"Error deleting S3 files for {email} (user_id: {user_id}): {str(e)}"
-						s3_deletion_summary['errors'].append(error_msg)
-						print(error_msg)
-					
-					# Delete tenant in Weaviate
-					try:
-						if user_id:
-							delete_tenant(user_id)  # Using email as tenant name based on context
-					except Exception as e:
-						print(f"Error deleting Weaviate tenant for {email} and user_id {user_id}: {e}")
-						# Continue with Firebase deletion even if Weaviate fails
-					
-					# Delete user in Firebase
-					auth.delete_user(user_id)
-					
-					success_count += 1
-					print(f"Successfully deleted account for {email}")
-					
-				except auth.UserNotFoundError:
+		success_count = 0
+		failed_emails = []
+		errors = []
+		s3_deletion_summary = {
+			'total_files_deleted': 0,
+			'tenant_deletions': [],
+			'errors': []
+		}
+		semaphore = asyncio.Semaphore(tenant_data_deletion_concurrency)
+
+		# Stream the CSV in chunks of one Firebase delete batch, so memory stays bounded for large files
+		for emails in chunked(iter_csv_emails(csv_file_path), firebase_delete_users_batch_size):
+			# Look up Firebase auth IDs in batches
+			try:
+				uid_by_email, not_found_emails, invalid_emails = await run_in_threadpool(get_firebase_uids_by_email, emails)
+			except Exception as e:
+				# Record the chunk as failed and carry on, so results for earlier chunks are still returned
+				logger.exception("Error looking up Firebase users")
+				for email in emails:
 					failed_emails.append(email)
-					errors.append(f"User not found in Firebase: {email}")
-					print(f"User not found in Firebase: {email}")
-				except Exception as e:
+					errors.append(f"Error looking up {email}: {str(e)}")
+				continue
+
+			for email, reason in invalid_emails.items():
+				failed_emails.append(email)
+				errors.append(f"Invalid email {email}: {reason}")
+				logger.warning("Invalid email %s: %s", email, reason)
+			for email in not_found_emails:
+				failed_emails.append(email)
+				errors.append(f"User not found in Firebase: {email}")
+				logger.warning("User not found in Firebase: %s", email)
+
+			# Delete S3 files and Weaviate tenants for the chunk's users concurrently, capped by the semaphore
+			await asyncio.gather(*[
+				delete_tenant_data(email, user_id, s3_deletion_summary, semaphore)
+				for email, user_id in uid_by_email.items()
+			])
+
+			# Delete users in Firebase in batches
+			try:
+				firebase_failures = await run_in_threadpool(delete_firebase_users, uid_by_email)
+			except Exception as e:
+				logger.exception("Error deleting Firebase users")
+				firebase_failures = {email: str(e) for email in uid_by_email}
+
+			for email in uid_by_email:
+				if email in firebase_failures:
 					failed_emails.append(email)
-					error_msg = f"Error deleting {email}: {str(e)}"
+					error_msg = f"Error deleting {email}: {firebase_failures[email]}"
 					errors.append(error_msg)
-					print(error_msg)
-					traceback.print_exc()
+					logger.error(error_msg)
+				else:
+					success_count += 1
+					logger.info("Successfully deleted account for %s", email)
 		
 		return DeleteAccountsResponse(
 			success_count=success_count,
@@ -114,8 +197,10 @@ async def delete_accounts():
 			s3_deletion_summary=s3_deletion_summary
 		)
 		
+	except HTTPException:
+		raise
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=f"Error processing emails.csv file: {str(e)}")
 
 if __name__ == "__main__":
-	delete_accounts()
\ No newline at end of file
+	delete_accounts()
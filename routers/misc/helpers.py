@@ -1,13 +1,33 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, HttpUrl
+from cachetools import TTLCache
+import asyncio
+import httpx
+import logging
 import requests
 import PyPDF2
-import io
+import re
 import tempfile
+import threading
 import os
-from typing import Optional, Tuple
+from typing import IO, Dict, List, Optional, Tuple
 
-router = APIRouter(prefix="/helpers", tags=["helpers"])
+logger = logging.getLogger(__name__)
+
+# PDFium (C++ engine behind Chrome's viewer) extracts text far faster than pure-Python PyPDF2,
+# which is kept as the fallback for documents PDFium rejects
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    logger.warning("pypdfium2 not installed, falling back to PyPDF2 for PDF parsing")
+    pdfium = None
+
+router = APIRouter(prefix="/helpers", tags=["helpers"], default_response_class=ORJSONResponse)
+
+# Shared async client so PDF downloads reuse pooled TCP/TLS connections across requests
+pdf_http_client = httpx.AsyncClient(follow_redirects=True)
 
 class PDFUrlRequest(BaseModel):
     url: HttpUrl
@@ -18,9 +38,75 @@ class PDFResponse(BaseModel):
     num_pages: int
     url: str
 
+# Downloads are spooled to disk past this size instead of being held in memory
+pdf_spool_max_memory_bytes = 8 * 1024 * 1024
+pdf_download_chunk_bytes = 64 * 1024
+
+whitespace_re = re.compile(r"\s+")
+
+# The PDFium library is not thread-safe, so every call into it from threadpool workers is serialized.
+# This means one PDF is parsed at a time per worker process; PyPDF2 fallbacks are not affected
+pdfium_lock = threading.Lock()
+
+def extract_page_texts_pdfium(pdf_file: IO[bytes]) -> List[str]:
+    """Extract the text of every page with PDFium"""
+    # PdfDocument only takes file objects with readinto(), which SpooledTemporaryFile lacks before
+    # Python 3.11, so hand it the bytes (read before taking the lock, so spooled disk reads do not hold it)
+    pdf_bytes = pdf_file.read()
+    with pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            page_texts = []
+            for page_index in range(len(pdf)):
+                page = pdf[page_index]
+                textpage = page.get_textpage()
+                page_texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return page_texts
+        finally:
+            pdf.close()
+
+def extract_page_texts_pypdf2(pdf_file: IO[bytes]) -> List[str]:
+    """Extract the text of every page with PyPDF2"""
+    pdf_reader = PyPDF2.PdfReader(pdf_file)
+    return [page.extract_text() or "" for page in pdf_reader.pages]
+
+def parse_pdf_file(pdf_file: IO[bytes]) -> Tuple[str, int]:
+    """
+    Parse a PDF file object and return the extracted text and number of pages.
+    CPU bound, so async callers should run it in a threadpool.
+
+    Args:
+        pdf_file: Seekable binary file object positioned at the start of the PDF
+
+    Returns:
+        Tuple containing (extracted_text, num_pages)
+
+    Raises:
+        PyPDF2.errors.PdfReadError: If neither parser can read the PDF
+    """
+    # Extract text from all pages, joined once at the end
+    page_texts = None
+    if pdfium is not None:
+        try:
+            page_texts = extract_page_texts_pdfium(pdf_file)
+        except Exception as e:
+            logger.warning(f"PDFium failed to parse PDF, falling back to PyPDF2: {e}")
+            pdf_file.seek(0)
+
+    if page_texts is None:
+        page_texts = extract_page_texts_pypdf2(pdf_file)
+
+    # Clean up the text (collapse whitespace runs in one pass, without a token list)
+    text_content = whitespace_re.sub(" ", " ".join(page_texts)).strip()
+
+    return text_content, len(page_texts)
+
 def read_pdf_from_url(url: str, timeout: int = 30) -> Tuple[str, int]:
     """
     Read PDF content from a URL and return the parsed text and number of pages.
+    Blocking; the /read_pdf route uses download_pdf + parse_pdf_file instead.
 
     Args:
         url: The URL of the PDF to read
@@ -34,32 +120,96 @@ def read_pdf_from_url(url: str, timeout: int = 30) -> Tuple[str, int]:
         PyPDF2.errors.PdfReadError: If PDF parsing fails
         Exception: For any other unexpected errors
     """
-    # Download the PDF
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-
-    # Check if the response is actually a PDF
-    content_type = response.headers.get('content-type', '')
-    if 'application/pdf' not in content_type and not url.endswith('.pdf'):
-        # Try to parse anyway, but warn
-        pass
-
-    # Create a BytesIO object from the PDF content
-    pdf_bytes = io.BytesIO(response.content)
-
-    # Parse the PDF
-    pdf_reader = PyPDF2.PdfReader(pdf_bytes)
-
-    # Extract text from all pages
-    text_content = ""
-    for page_num in range(len(pdf_reader.pages)):
-        page = pdf_reader.pages[page_num]
-        text_content += page.extract_text() + "\n"
-
-    # Clean up the text (remove excessive whitespace)
-    text_content = " ".join(text_content.split())
+    # Stream the PDF into a spooled file rather than holding the whole body in memory
+    with requests.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        with tempfile.SpooledTemporaryFile(max_size=pdf_spool_max_memory_bytes) as pdf_file:
+            for chunk in response.iter_content(chunk_size=pdf_download_chunk_bytes):
+                pdf_file.write(chunk)
+            pdf_file.seek(0)
+            return parse_pdf_file(pdf_file)
+
+async def download_pdf(url: str, timeout: int = 30) -> IO[bytes]:
+    """
+    Stream a PDF into a spooled temporary file without blocking the event loop.
+    The caller is responsible for closing the returned file.
 
-    return text_content, len(pdf_reader.pages)
+    Raises:
+        httpx.HTTPError: If PDF download fails
+    """
+    pdf_file = tempfile.SpooledTemporaryFile(max_size=pdf_spool_max_memory_bytes)
+    try:
+        async with pdf_http_client.stream("GET", url, timeout=timeout) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_size=pdf_download_chunk_bytes):
+                pdf_file.write(chunk)
+    except Exception:
+        pdf_file.close()
+        raise
+
+    pdf_file.seek(0)
+    return pdf_file
+
+# Parsed PDFs keyed by (url, ETag / Last-Modified), so repeat requests skip the download + parse.
+# Bounded by total extracted text (~64M characters per worker) rather than entry count, since one PDF can be huge
+pdf_cache_max_text_chars = 64 * 1024 * 1024
+pdf_cache: TTLCache = TTLCache(maxsize=pdf_cache_max_text_chars, ttl=3600, getsizeof=lambda result: len(result[0]))
+# One lock per key so concurrent requests for the same PDF wait for a single download + parse
+pdf_cache_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+# The HEAD that fetches the validator is paid on every request, so it gets a short timeout of its own
+pdf_validator_timeout_seconds = 5
+
+async def get_pdf_cache_key(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Build the cache key from the URL and its validator, so a changed file is not served stale.
+    Returns None when the HEAD fails or gives no ETag / Last-Modified, since freshness can't be checked then.
+    """
+    try:
+        response = await pdf_http_client.head(url, timeout=pdf_validator_timeout_seconds)
+        # Servers that reject HEAD (e.g. 403 / 405 on presigned S3 URLs) give no usable validator
+        validator = (response.headers.get("etag") or response.headers.get("last-modified")) if response.is_success else None
+    except httpx.HTTPError:
+        validator = None
+    if validator is None:
+        return None
+    return url, validator
+
+async def download_and_parse_pdf(url: str, timeout: int = 30) -> Tuple[str, int]:
+    """Download a PDF and parse it in the threadpool, without touching pdf_cache"""
+    pdf_file = await download_pdf(url, timeout)
+    try:
+        return await run_in_threadpool(parse_pdf_file, pdf_file)
+    finally:
+        pdf_file.close()
+
+async def read_pdf_cached(url: str, timeout: int = 30) -> Tuple[str, int]:
+    """Download and parse a PDF, serving repeats from pdf_cache and coalescing concurrent misses"""
+    key = await get_pdf_cache_key(url)
+    if key is None:
+        # Without a validator a cached result could be stale, so always fetch
+        return await download_and_parse_pdf(url, timeout)
+
+    cached = pdf_cache.get(key)
+    if cached is not None:
+        return cached
+
+    lock = pdf_cache_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            # Another request may have filled the cache while we waited
+            cached = pdf_cache.get(key)
+            if cached is not None:
+                return cached
+
+            result = await download_and_parse_pdf(url, timeout)
+            # A single result larger than the whole cache is returned without caching it
+            if len(result[0]) <= pdf_cache_max_text_chars:
+                pdf_cache[key] = result
+            return result
+    finally:
+        # Drop the lock once nobody is using it so the dict does not grow unbounded
+        if not lock.locked() and pdf_cache_locks.get(key) is lock:
+            del pdf_cache_locks[key]
 
 @router.post("/read_pdf", response_model=PDFResponse)
 async def read_pdf(request: PDFUrlRequest):
@@ -73,7 +223,8 @@ async def read_pdf(request: PDFUrlRequest):
         PDFResponse with extracted text, number of pages, and source URL
     """
     try:
-        text_content, num_pages = read_pdf_from_url(str(request.url), request.timeout)
+        # Download asynchronously, then parse in the threadpool so the event loop stays free
+        text_content, num_pages = await read_pdf_cached(str(request.url), request.timeout)
 
         return PDFResponse(
             text=text_content,
@@ -81,7 +232,7 @@ async def read_pdf(request: PDFUrlRequest):
             url=str(request.url)
         )
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to download PDF from URL: {str(e)}"
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import os
-from utils.notifs import send_ios_image_notification
+from utils.notifs import (
+    build_notification_message,
+    send_ios_image_notification,
+    send_notification,
+    send_notifications_batch,
+)
 
 router = APIRouter(
     prefix="/notifications",
     tags=["notifications"],
+    default_response_class=ORJSONResponse,
 )
 
 class IOSImageNotificationRequest(BaseModel):
@@ -37,8 +45,9 @@ async def send_ios_image_notification_route(notification_request: IOSImageNotifi
         if not notification_request.image_url:
             raise HTTPException(status_code=400, detail="Image URL is required")
         
-        # Send the notification
-        response = send_ios_image_notification(
+        # Send the notification (blocking FCM call, so run it in the threadpool)
+        response = await run_in_threadpool(
+            send_ios_image_notification,
             token=notification_request.token,
             title=notification_request.title,
             body=notification_request.body,
@@ -73,15 +82,14 @@ async def send_standard_notification_route(notification_request: StandardNotific
     - click_action: An action identifier for Android to open a specific activity
     - link: A URL that will be opened when the notification is clicked
     """
-    from utils.notifs import send_notification
-    
     try:
         # Validate the token
         if not notification_request.token:
             raise HTTPException(status_code=400, detail="Device token is required")
         
-        # Send the notification
-        response = send_notification(
+        # Send the notification (blocking FCM call, so run it in the threadpool)
+        response = await run_in_threadpool(
+            send_notification,
             token=notification_request.token,
             title=notification_request.title,
             body=notification_request.body,
@@ -96,4 +104,54 @@ async def send_standard_notification_route(notification_request: StandardNotific
         return {"message": "Notification sent successfully", "message_id": response}
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error sending notification: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error sending notification: {str(e)}")
+
+@router.post("/standard/batch")
+async def send_standard_notification_batch_route(notification_requests: List[StandardNotificationRequest], request: Request):
+    """
+    Send many standard notifications with batched FCM calls (up to 500 messages per call).
+    
+    Returns the result for each notification in request order.
+    """
+    try:
+        # Validate the tokens
+        if any(not notification_request.token for notification_request in notification_requests):
+            raise HTTPException(status_code=400, detail="Device token is required")
+
+        messages = [
+            build_notification_message(
+                token=notification_request.token,
+                title=notification_request.title,
+                body=notification_request.body,
+                data=notification_request.data,
+                click_action=notification_request.click_action,
+                link=notification_request.link
+            )
+            for notification_request in notification_requests
+        ]
+
+        # Send the notifications (blocking FCM calls, so run them in the threadpool)
+        responses = await run_in_threadpool(send_notifications_batch, messages)
+
+        results = [
+            {
+                "token": notification_request.token,
+                "success": response.success,
+                "message_id": response.message_id,
+                "error": str(response.exception) if response.exception else None,
+            }
+            for notification_request, response in zip(notification_requests, responses)
+        ]
+        success_count = sum(1 for result in results if result["success"])
+
+        return {
+            "message": f"Sent {success_count} of {len(results)} notifications",
+            "success_count": success_count,
+            "failure_count": len(results) - success_count,
+            "results": results,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error sending notifications: {str(e)}")
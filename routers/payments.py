@@ -1,25 +1,43 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+import logging
 import traceback
+import threading
 import os
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import Request
 import stripe
+from cachetools import TTLCache
 from db.models.constella.constella_subscription import ConstellaSubscription
+from db.models.constella.processed_webhook_event import ProcessedWebhookEvent
+from utils.constella.financials.webhook_executor import handle_webhook_event, read_webhook_body
 from utils.constella.financials.upgrading import upgrade_constella_subscription_to_ultra
 from utils.loops import (create_loops_contact, get_loops_contact, send_transactional_email,
-	update_contact_property)
-from utils.constella.financials.subscriptions import (get_plan_name_from_stripe_price_id,
-	get_stella_credits_from_stripe_price_id)
+	update_contact_properties, update_contact_property)
+from utils.constella.financials.subscriptions import get_plan_from_stripe_price_id
+
+logger = logging.getLogger(__name__)
 
 stripe.api_key = os.getenv('STRIPE_API_KEY') 
+# Shared requests-based client so Stripe calls reuse keep-alive connections instead of new TLS handshakes
+stripe.default_http_client = stripe.RequestsClient()
 stripe_endpoint_secret = os.getenv('STRIPE_ENDPOINT_SECRET')
 
 router = APIRouter(
 	prefix="/payments",
+	default_response_class=ORJSONResponse,
 )
 
+def parse_period_end(period_end: str) -> datetime:
+	"""
+	Parse a period_end serialized by parse_json (e.g. "2025-01-31T12:00:00Z", possibly with milliseconds)
+	into a naive UTC datetime. fromisoformat is much cheaper than strptime; Python 3.10 rejects the "Z" suffix.
+	"""
+	return datetime.fromisoformat(period_end.rstrip("Z"))
+
 class GetSubscriptionReq(BaseModel):
 	email: Optional[str] = None
 	auth_user_id: Optional[str] = None
@@ -27,7 +45,7 @@ class GetSubscriptionReq(BaseModel):
 	display_name: Optional[str] = None
 	from_horizon: Optional[bool] = False
 
-def create_subscription(email, auth_user_id, display_name=None, from_horizon=False):
+def create_subscription(email, auth_user_id, background_tasks: BackgroundTasks, display_name=None, from_horizon=False):
 	# Set plan name and period end for Horizon users
 	plan_name = None
 	period_end = None
@@ -35,28 +53,36 @@ def create_subscription(email, auth_user_id, display_name=None, from_horizon=Fal
 	# 	plan_name = "ultra_monthly"
 	# 	period_end = datetime.now() + timedelta(days=90)  # 3 months from now
 
-	sub = ConstellaSubscription.create_subscription('', email, period_end=period_end, auth_user_id=auth_user_id, plan_name=plan_name)
+	if email:
+		# Upsert on email: concurrent first requests usually get the same row. email has no unique index, so two
+		# upserts racing past the match can still both insert; this narrows the duplicate window rather than closing it
+		sub, created = ConstellaSubscription.get_or_create_subscription('', email, period_end=period_end, auth_user_id=auth_user_id, plan_name=plan_name)
+		if not created:
+			return sub
+	else:
+		sub = ConstellaSubscription.create_subscription('', email, period_end=period_end, auth_user_id=auth_user_id, plan_name=plan_name)
 	if display_name == '':
 		display_name = None
-	create_loops_contact(email=email, user_id=sub['_id'], first_name=display_name, auth_user_id=auth_user_id, from_horizon=from_horizon, call_for_horizon=True)
+	# Loops sync is not needed for the response, so it runs after the response is sent
+	background_tasks.add_task(create_loops_contact, email=email, user_id=sub['_id'], first_name=display_name, auth_user_id=auth_user_id, from_horizon=from_horizon, call_for_horizon=True)
 	return sub
 
 @router.post("/get-subscription")
-def get_subscription(req: GetSubscriptionReq):
+async def get_subscription(req: GetSubscriptionReq, background_tasks: BackgroundTasks):
 	try:
-		# get subscription if it exists
-		subscription = ConstellaSubscription.get_user_info(req.email, req.auth_user_id, req.license_key)
+		# get subscription if it exists (awaited on the async client, so no threadpool worker is held)
+		subscription = await ConstellaSubscription.get_user_info_cached_async(req.email, req.auth_user_id, req.license_key)
 		if subscription:
 			# Check if auth_user_id is not in subscription and it's provided in the request
 			if 'auth_user_id' not in subscription and req.auth_user_id:
-				ConstellaSubscription.update_auth_user_id(subscription['_id'], req.auth_user_id)
+				await run_in_threadpool(ConstellaSubscription.update_auth_user_id, subscription['_id'], req.auth_user_id)
 			
 			print("subscription: ", subscription)
 			# TODO: here can do plan name setting via stripe product names to map to starter / ultra
 			return {"subscription": subscription}
 		else:
 			# Otherwise, create a new subscription
-			sub = create_subscription(req.email, req.auth_user_id, req.display_name, req.from_horizon)
+			sub = await run_in_threadpool(create_subscription, req.email, req.auth_user_id, background_tasks, req.display_name, req.from_horizon)
 			return {"subscription": sub}
 	except Exception as e:
 		traceback.print_exc()
@@ -68,7 +94,7 @@ class GetOrCreateSubscriptionReq(BaseModel):
 	from_horizon: Optional[bool] = False
 
 @router.post("/get-or-create-subscription")
-def get_or_create_subscription(req: GetOrCreateSubscriptionReq):
+def get_or_create_subscription(req: GetOrCreateSubscriptionReq, background_tasks: BackgroundTasks):
 	try:
 		# check if subscription exists
 		subscription = ConstellaSubscription.get_user_info(req.email)
@@ -76,7 +102,7 @@ def get_or_create_subscription(req: GetOrCreateSubscriptionReq):
 			return {"subscription": subscription}
 		
 		# create subscription
-		sub = create_subscription(req.email, req.auth_user_id, req.display_name, req.from_horizon)
+		sub = create_subscription(req.email, req.auth_user_id, background_tasks, req.display_name, req.from_horizon)
 		return {"subscription": sub}
 	except Exception as e:
 		traceback.print_exc()
@@ -86,7 +112,7 @@ class GetLicenseKeyReq(BaseModel):
 	checkout_session_id: str
 
 @router.post("/get-constella-license-key")
-def get_license_key(req: GetLicenseKeyReq):
+def get_license_key(req: GetLicenseKeyReq, background_tasks: BackgroundTasks):
 	try:
 		checkout_session = stripe.checkout.Session.retrieve(req.checkout_session_id)
 		customer = stripe.Customer.retrieve(checkout_session.customer)
@@ -94,9 +120,8 @@ def get_license_key(req: GetLicenseKeyReq):
 		# look up subscription model in DB and its license key
 		license_key = ConstellaSubscription.get_license_key(customer.id)
 		
-		# update contact properties with stripe customer id & license key
-		update_contact_property(customer.email, "stripeCustomerId", customer.id)
-		update_contact_property(customer.email, "licenseKey", license_key)
+		# update contact properties with stripe customer id & license key (after the response is sent)
+		background_tasks.add_task(update_contact_properties, customer.email, {"stripeCustomerId": customer.id, "licenseKey": license_key})
 
 		if not license_key:
 			raise HTTPException(status_code=422, detail="License key not found")
@@ -108,25 +133,26 @@ def get_license_key(req: GetLicenseKeyReq):
 		raise HTTPException(status_code=500, detail="Failed to get license key")
 
 class VerifyLicenseKeyReq(BaseModel):
+	# Pasted keys often carry stray whitespace; strip it during validation
+	model_config = ConfigDict(str_strip_whitespace=True)
+
 	license_key: str
 
 @router.post("/verify-constella-license-key")
-def verify_license_key(req: VerifyLicenseKeyReq):
+async def verify_license_key(req: VerifyLicenseKeyReq):
 	try:
-		req.license_key = req.license_key.strip()
-		
 		# look up subscription model in DB and its license key
-		subscription = ConstellaSubscription.get_subscription_by_license_key(req.license_key)
+		subscription = await ConstellaSubscription.get_subscription_by_license_key_cached_async(req.license_key)
 
 		if not subscription:
 			print("License key not found")
 			raise HTTPException(status_code=422, detail="License key not found")
 				
-		# check if subscription is active
+		# check if subscription is active (period_end is serialized in UTC, so compare against UTC now)
 		period_end = subscription.get('period_end')
-		period_end = datetime.strptime(period_end, "%Y-%m-%dT%H:%M:%SZ")
+		period_end = parse_period_end(period_end)
 
-		if period_end < datetime.now():
+		if period_end < datetime.now(timezone.utc).replace(tzinfo=None):
 			print("License key expired")
 			raise HTTPException(status_code=422, detail="License key expired")
 
@@ -143,13 +169,28 @@ def verify_license_key(req: VerifyLicenseKeyReq):
 		traceback.print_exc()
 		raise HTTPException(status_code=500, detail="Failed to verify license key")
 
+# Loops contacts change rarely, and check-early-og is called on every app launch
+loops_contact_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+loops_contact_cache_lock = threading.Lock()
+
+def get_loops_contact_cached(email: str):
+	with loops_contact_cache_lock:
+		if email in loops_contact_cache:
+			return loops_contact_cache[email]
+	contact = get_loops_contact(email)
+	# Failed lookups are not cached so they are retried on the next call
+	if contact is not None:
+		with loops_contact_cache_lock:
+			loops_contact_cache[email] = contact
+	return contact
+
 class CheckEarlyOGReq(BaseModel):
 	email: str
 
 @router.post("/check-early-og")
 def check_early_og(req: CheckEarlyOGReq):
 	try:
-		contact = get_loops_contact(req.email)
+		contact = get_loops_contact_cached(req.email)
 
 		user_group = contact.get('userGroup', None)
 
@@ -190,8 +231,13 @@ def increment_stella_credits(req: IncrementStellaCreditsReq):
 # Define the Stripe webhook endpoint
 @router.post("/stripe-webhook")
 async def stripe_webhook(request: Request):
-	payload = await request.body()
+	# Reject unsigned requests before reading the body; oversized ones are cut off while it is read
 	sig_header = request.headers.get('stripe-signature')
+	if not sig_header:
+		logger.warning('Stripe webhook missing signature')
+		raise HTTPException(status_code=400, detail="Missing signature")
+
+	payload = await read_webhook_body(request)
 
 	try:
 		event = stripe.Webhook.construct_event(
@@ -199,153 +245,151 @@ async def stripe_webhook(request: Request):
 		)
 	except ValueError as e:
 		# Invalid payload
-		print('Invalid payload')
+		logger.warning('Stripe webhook invalid payload')
 		raise HTTPException(status_code=400, detail="Invalid payload")
 	except stripe.error.SignatureVerificationError as e:
 		# Invalid signature
-		print('Invalid signature')
+		logger.warning('Stripe webhook invalid signature')
 		raise HTTPException(status_code=400, detail="Invalid signature")
 
-	# Handle the events
+	# Stripe retries events on timeouts / 5xx; acknowledge ones already handled without re-running side effects
+	if await run_in_threadpool(ProcessedWebhookEvent.is_processed, "stripe", event["id"]):
+		logger.info("STRIPE WEBHOOK: Event already processed: %s", event['id'])
+		return {"status": "success"}
 
-	try:
-		## INVOICE PAID
-		if event['type'] == 'invoice.paid':
-			invoice = event['data']['object']
-			stripe_id = invoice.get('customer')
-			email = invoice.get('customer_email')
-			customer_name = invoice.get('customer_name', '')
-			lines_data = invoice.get('lines').get('data')
-			# get first line item
-			line_data = lines_data[0]
-
-			# Get payment intent from invoice
-			payment_intent = invoice.get('payment_intent')
-
-			user_email = ""
-			user_id = ""
-
-			# Get sessions and get user_email from metadata
-			try:
-				sessions = stripe.checkout.Session.list(payment_intent=payment_intent)
-			except Exception as e:
-				print(f"STRIPE WEBHOOK ERROR: No sessions found for invoice: {invoice['id']}")
-				sessions = None
-
-			print("STRIPE WEBHOOK: Sessions: ")
-			print(sessions)
-
-			if sessions and sessions.data:
-				# Loop through sessions and get metadata
-				for session in sessions.data:
-					print('SESSION: ', session)
-					if session.client_reference_id:
-						user_id = session.client_reference_id
-						break
-					if session.metadata.get('userEmail'):
-						user_email = session.metadata['userEmail']
-						break
-
-			# If no user email & id was found, use email in invoice + log error
-			if not user_email and not user_id:
-				print(f"INVOICE PAID: No user email nor id found for sessions: {invoice['id']}")
-				user_email = email  # Using the email from the invoice
-
-			# subscription id
-			subscription_id = line_data.get('subscription')
-			
-			# get product id
-			product_id = line_data.get('price').get('product')
-
-			# get period end
-			period_end = line_data.get('period').get('end')
-			# convert to datetime
-			period_end = datetime.fromtimestamp(period_end)
-
-			# get price id
-			price_id = line_data.get('price').get('id')
-
-			# get plan name
-			plan_name = get_plan_name_from_stripe_price_id(price_id)
-
-			stella_credits_grant = get_stella_credits_from_stripe_price_id(price_id)
-
-			print("Updating user id: ", user_id)
-			print("Updating stripe id: ", stripe_id)
-			print("Updating user email: ", user_email)
-			print("Updating period end: ", period_end)
-			print("Updating subscription id: ", subscription_id)
-			print("Updating product id: ", product_id)
-			print("Updating plan name: ", plan_name)
-
-			# Create or update an existing subscription
-			ConstellaSubscription.create_or_update_subscription_v2(user_id, stripe_id, user_email, period_end, subscription_id, product_id, stella_credits_grant=stella_credits_grant, plan_name=plan_name, auth_user_id=user_id)
-			update_contact_property(email, "subscriptionStatus", "subscribed")
-			if customer_name:
-				update_contact_property(email, "firstName", customer_name)
-
-			return {"status": "success"}
-		elif event['type'] == "invoice.payment_failed":
-			# handle payment failed
-			failed_invoice_data = event['data']['object']
-			failed_customer_id = failed_invoice_data['customer']
-			failed_customer_email = failed_invoice_data.get('customer_email')
-
-			# retrieve customer object if not found
-			if not failed_customer_email:
-				try:
-					customer = stripe.Customer.retrieve(failed_customer_id)
-					failed_customer_email = customer['email']
-				except Exception as err:
-					print(f"STRIPE WEBHOOK ERROR: {err}")
+	await handle_webhook_event("stripe", event['id'], event['type'], handle_stripe_event, event)
+	return {"status": "success"}
 
-			# if has email, send loops transactional to get them to update payment
-			if failed_customer_email:
-				send_transactional_email(failed_customer_email, "cm2njbbeq00ksuudn5oz8z5gk")
-				update_contact_property(failed_customer_email, "subscriptionStatus", "payment_failed")
+def handle_stripe_event(event):
+	"""
+	Run the side effects for a verified Stripe event. Raises on failure so Stripe redelivers the event.
+	"""
+	## INVOICE PAID
+	if event['type'] == 'invoice.paid':
+		invoice = event['data']['object']
+		stripe_id = invoice.get('customer')
+		email = invoice.get('customer_email')
+		customer_name = invoice.get('customer_name', '')
+		lines_data = invoice.get('lines').get('data')
+		# get first line item
+		line_data = lines_data[0]
+
+		# Get payment intent from invoice
+		payment_intent = invoice.get('payment_intent')
+
+		user_email = ""
+		user_id = ""
+
+		# Get the checkout session and get user id / user_email from it
+		# (a payment intent belongs to at most one checkout session, so only fetch one)
+		try:
+			sessions = stripe.checkout.Session.list(payment_intent=payment_intent, limit=1)
+		except Exception as e:
+			logger.warning("STRIPE WEBHOOK ERROR: No sessions found for invoice: %s", invoice['id'])
+			sessions = None
+
+		session = sessions.data[0] if sessions and sessions.data else None
+		# Lazy formatting, so the StripeObject is only serialized when debug logging is on
+		logger.debug('SESSION: %s', session)
+
+		if session:
+			if session.client_reference_id:
+				user_id = session.client_reference_id
+			elif session.metadata and session.metadata.get('userEmail'):
+				user_email = session.metadata['userEmail']
+
+		# If no user email & id was found, use email in invoice + log error
+		if not user_email and not user_id:
+			logger.warning("INVOICE PAID: No user email nor id found for sessions: %s", invoice['id'])
+			user_email = email  # Using the email from the invoice
+
+		# subscription id
+		subscription_id = line_data.get('subscription')
+		
+		# get product id
+		product_id = line_data.get('price').get('product')
 
-		elif event['type'] == "customer.subscription.deleted":
-			# handle subscription cancelled
-			data = event['data']['object']
-			cus_id = data['customer']
+		# get period end
+		period_end = line_data.get('period').get('end')
+		# convert to datetime
+		period_end = datetime.fromtimestamp(period_end)
 
-			print(f"STRIPE WEBHOOK: Subscription Cancelled: {cus_id}")
+		# get price id
+		price_id = line_data.get('price').get('id')
 
-			cancelled_user_email = ""
+		# get plan name and credits
+		plan_name, stella_credits_grant = get_plan_from_stripe_price_id(price_id)
 
-			# get customer from Stripe using customer id and set email
-			try:
-				customer = stripe.Customer.retrieve(cus_id)
-				cancelled_user_email = customer['email']
-				if not cancelled_user_email:
-					print(f"STRIPE WEBHOOK ERROR: No user email found for customer: {cus_id}")
-			except Exception as err:
-				print(f"STRIPE WEBHOOK ERROR: {err}")
+		logger.debug(
+			"Updating user id=%s stripe id=%s email=%s period_end=%s subscription id=%s product id=%s plan=%s",
+			user_id, stripe_id, user_email, period_end, subscription_id, product_id, plan_name
+		)
 
+		# Create or update an existing subscription
+		ConstellaSubscription.create_or_update_subscription_v2(user_id, stripe_id, user_email, period_end, subscription_id, product_id, stella_credits_grant=stella_credits_grant, plan_name=plan_name, auth_user_id=user_id)
+		contact_properties = {"subscriptionStatus": "subscribed"}
+		if customer_name:
+			contact_properties["firstName"] = customer_name
+		update_contact_properties(email, contact_properties)
+
+	elif event['type'] == "invoice.payment_failed":
+		# handle payment failed
+		failed_invoice_data = event['data']['object']
+		failed_customer_id = failed_invoice_data['customer']
+		failed_customer_email = failed_invoice_data.get('customer_email')
+
+		# retrieve customer object if not found
+		if not failed_customer_email:
 			try:
-				# see if any active subscriptions (not cancelled or returned), in which case skip
-				subscription = stripe.Subscription.list(customer=cus_id)
-				# has subscription
-				if subscription['data']:
-					print(f"Cancelling user already has subscription, returning: {subscription}")
-					return {"status": "success"}
+				customer = stripe.Customer.retrieve(failed_customer_id)
+				failed_customer_email = customer['email']
 			except Exception as err:
-				print(f"STRIPE WEBHOOK ERROR: {err}")
+				logger.error("STRIPE WEBHOOK ERROR: %s", err)
+
+		# if has email, send loops transactional to get them to update payment
+		if failed_customer_email:
+			send_transactional_email(failed_customer_email, "cm2njbbeq00ksuudn5oz8z5gk")
+			update_contact_property(failed_customer_email, "subscriptionStatus", "payment_failed")
+
+	elif event['type'] == "customer.subscription.deleted":
+		# handle subscription cancelled
+		data = event['data']['object']
+		cus_id = data['customer']
+
+		logger.info("STRIPE WEBHOOK: Subscription Cancelled: %s", cus_id)
+
+		cancelled_user_email = ""
+		subscription = None
+
+		# get customer from Stripe using customer id and set email,
+		# expanding their remaining subscriptions so no separate list call is needed
+		try:
+			customer = stripe.Customer.retrieve(cus_id, expand=['subscriptions'])
+			subscription = customer.get('subscriptions')
+			cancelled_user_email = customer['email']
+			if not cancelled_user_email:
+				logger.warning("STRIPE WEBHOOK ERROR: No user email found for customer: %s", cus_id)
+		except Exception as err:
+			logger.error("STRIPE WEBHOOK ERROR: %s", err)
+
+		try:
+			# see if any active subscriptions (not cancelled or returned), in which case skip
+			if subscription is None:
+				subscription = stripe.Subscription.list(customer=cus_id)
+			# has subscription
+			if subscription['data']:
+				logger.debug("Cancelling user already has subscription, returning: %s", subscription)
+				return
+		except Exception as err:
+			logger.error("STRIPE WEBHOOK ERROR: %s", err)
 
-			current_subscription_end = data['current_period_end']
-			subscription_end_date = datetime.fromtimestamp(current_subscription_end)
-			print(f"Subscription will end on: {subscription_end_date.isoformat()}")
+		current_subscription_end = data['current_period_end']
+		subscription_end_date = datetime.fromtimestamp(current_subscription_end)
+		logger.debug("Subscription will end on: %s", subscription_end_date)
 
-			if cancelled_user_email:
-				update_contact_property(cancelled_user_email, "subscriptionStatus", "cancelled")
+		if cancelled_user_email:
+			update_contact_property(cancelled_user_email, "subscriptionStatus", "cancelled")
 
-			
-	except:
-		print('stripe webhook error!!')
-		traceback.print_exc()
-		raise HTTPException(status_code=500, detail="Failed to process event")
-
-	return {"status": "success"}
 
 class UpgradeToUltraReq(BaseModel):
 	subscription_id: Optional[str] = None
@@ -406,36 +450,30 @@ class CancelSubscriptionReq(BaseModel):
 	auth_user_id: Optional[str] = None
 
 @router.post("/cancel")
-def cancel_subscription(req: CancelSubscriptionReq):
+def cancel_subscription(req: CancelSubscriptionReq, background_tasks: BackgroundTasks):
 	try:
-		# Get ALL subscriptions for the user, not just the best one
-		query = {"$or": []}
-		if req.email:
-			query["$or"].append({"email": req.email})
-		if req.auth_user_id:
-			query["$or"].append({"auth_user_id": req.auth_user_id})
-
-		if not query["$or"]:
+		if not req.email and not req.auth_user_id:
 			raise HTTPException(status_code=400, detail="Email or auth_user_id required")
 
-		# Get all subscriptions for this user
-		from db.mongodb import db
-		collection = db['constella_subscriptions']
-		all_subscriptions = list(collection.find(query))
+		# Get ALL subscriptions for the user, not just the best one
+		all_subscriptions = ConstellaSubscription.get_all_user_subscriptions(req.email, req.auth_user_id)
 		
 		if not all_subscriptions:
 			raise HTTPException(status_code=404, detail="No subscriptions found")
 
 		cancelled_count = 0
-		immediately_cancelled_count = 0
+		immediately_cancelled_ids = []
 		errors = []
 
-		# Cancel all Stripe subscriptions for each customer ID found
+		# Group the user's rows by Stripe customer ID so each customer is looked up in Stripe once
+		subscriptions_by_customer_id = {}
 		for subscription in all_subscriptions:
 			stripe_customer_id = subscription.get('stripe_customer_id')
-			if not stripe_customer_id:
-				continue
+			if stripe_customer_id:
+				subscriptions_by_customer_id.setdefault(stripe_customer_id, []).append(subscription)
 
+		# Cancel all Stripe subscriptions for each customer ID found
+		for stripe_customer_id, customer_subscriptions in subscriptions_by_customer_id.items():
 			try:
 				# Get all active Stripe subscriptions for this customer
 				stripe_subscriptions = stripe.Subscription.list(customer=stripe_customer_id)
@@ -443,10 +481,9 @@ def cancel_subscription(req: CancelSubscriptionReq):
 				# Check each subscription and handle based on status
 				for stripe_sub in stripe_subscriptions.data:
 					if stripe_sub.status == 'trialing':
-						# For trialing subscriptions, cancel immediately in our database
-						ConstellaSubscription.cancel_immediately_user_subscription(str(subscription['_id']))
-						immediately_cancelled_count += 1
-						print(f"Immediately cancelled trialing subscription in database: {subscription['_id']}")
+						# For trialing subscriptions, cancel immediately in our database (every row of this customer),
+						# written in one batch after the loop
+						immediately_cancelled_ids.extend(str(subscription['_id']) for subscription in customer_subscriptions)
 						
 						# Still cancel in Stripe as well
 						stripe.Subscription.delete(stripe_sub.id)
@@ -462,9 +499,17 @@ def cancel_subscription(req: CancelSubscriptionReq):
 				print(error_msg)
 				errors.append(error_msg)
 
-		# Update contact property in loops
+		# Cancel trialing rows in our database with a single write
+		immediately_cancelled_ids = list(dict.fromkeys(immediately_cancelled_ids))
+		immediately_cancelled_count = 0
+		if immediately_cancelled_ids:
+			ConstellaSubscription.bulk_cancel_immediately(immediately_cancelled_ids)
+			immediately_cancelled_count = len(immediately_cancelled_ids)
+			print(f"Immediately cancelled trialing subscriptions in database: {immediately_cancelled_ids}")
+
+		# Update contact property in loops (after the response is sent)
 		if req.email:
-			update_contact_property(req.email, "subscriptionStatus", "cancelled")
+			background_tasks.add_task(update_contact_property, req.email, "subscriptionStatus", "cancelled")
 
 		result = {
 			"status": "success",
@@ -489,7 +534,7 @@ class GiveCouponReq(BaseModel):
 	coupon_id: str
 
 @router.post("/give-coupon")
-def give_coupon(req: GiveCouponReq):
+def give_coupon(req: GiveCouponReq, background_tasks: BackgroundTasks):
 	try:
 		# Get the best subscription using the existing method
 		subscription = ConstellaSubscription.get_user_info(req.email, req.auth_user_id)
@@ -497,6 +542,7 @@ def give_coupon(req: GiveCouponReq):
 		if not subscription:
 			raise HTTPException(status_code=404, detail="No subscription found")
 
+		# RevenueCat-only users have no Stripe customer, so return before any Stripe call
 		stripe_customer_id = subscription.get('stripe_customer_id')
 		if not stripe_customer_id:
 			raise HTTPException(status_code=400, detail="No Stripe customer ID found")
@@ -508,9 +554,6 @@ def give_coupon(req: GiveCouponReq):
 		active_or_trialing_subscriptions = [sub for sub in stripe_subscriptions.data if sub.status in ['active', 'trialing']]
 		if not active_or_trialing_subscriptions:
 			return {"error": "none active"}
-		
-		if not stripe_subscriptions.data:
-			raise HTTPException(status_code=404, detail="No active Stripe subscription found")
 
 		# Apply coupon to the first active subscription
 		stripe_subscription = stripe_subscriptions.data[0]
@@ -521,9 +564,9 @@ def give_coupon(req: GiveCouponReq):
 			coupon=req.coupon_id
 		)
 
-		# Update contact property in loops
+		# Update contact property in loops (after the response is sent)
 		if req.email:
-			update_contact_property(req.email, "appliedCoupon", req.coupon_id)
+			background_tasks.add_task(update_contact_property, req.email, "appliedCoupon", req.coupon_id)
 
 		return {
 			"status": "success",
@@ -543,7 +586,7 @@ class GiveExtraTrialReq(BaseModel):
 	duration: int = 30  # days
 
 @router.post("/give-extra-trial")
-def give_extra_trial(req: GiveExtraTrialReq):
+def give_extra_trial(req: GiveExtraTrialReq, background_tasks: BackgroundTasks):
 	try:
 		# Get the best subscription using the existing method
 		subscription = ConstellaSubscription.get_user_info(req.email, req.auth_user_id)
@@ -555,7 +598,7 @@ def give_extra_trial(req: GiveExtraTrialReq):
 		current_period_end = subscription.get('period_end')
 		if current_period_end:
 			if isinstance(current_period_end, str):
-				current_period_end = datetime.strptime(current_period_end, "%Y-%m-%dT%H:%M:%SZ")
+				current_period_end = parse_period_end(current_period_end)
 			new_trial_end = current_period_end + timedelta(days=req.duration)
 		else:
 			new_trial_end = datetime.now() + timedelta(days=req.duration)
@@ -566,6 +609,7 @@ def give_extra_trial(req: GiveExtraTrialReq):
 			raise HTTPException(status_code=500, detail="Failed to update subscription period")
 
 		# If there's a Stripe customer ID and active subscription, update Stripe too
+		# (RevenueCat-only users have none, so no Stripe call is made for them)
 		stripe_customer_id = subscription.get('stripe_customer_id')
 		if stripe_customer_id:
 			try:
@@ -589,9 +633,9 @@ def give_extra_trial(req: GiveExtraTrialReq):
 				print(f"Failed to update Stripe trial end: {str(e)}")
 				# Continue anyway since we updated our database
 
-		# Update contact property in loops
+		# Update contact property in loops (after the response is sent)
 		if req.email:
-			update_contact_property(req.email, "trialExtended", req.duration)
+			background_tasks.add_task(update_contact_property, req.email, "trialExtended", req.duration)
 
 		return {
 			"status": "success",
@@ -1,24 +1,40 @@
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 import sentry_sdk
 from datetime import datetime, timezone, timedelta
 from db.models.constella.constella_subscription import ConstellaSubscription, free_stella_credits
-import json
+from db.models.constella.processed_webhook_event import ProcessedWebhookEvent
+from utils.constella.financials.webhook_executor import handle_webhook_event, read_webhook_body
+import hmac
+import logging
+import orjson
+import os
 from utils.constella.financials.subscriptions import get_plan_name, get_stella_credits
 from utils.loops import send_event, update_contact_property
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
-	prefix="/revenuecat"
+	prefix="/revenuecat",
+	default_response_class=ORJSONResponse,
 )
 
+# Shared secret RevenueCat sends as the webhook Authorization header, resolved once at import
+revenuecat_webhook_auth_token = os.getenv('REVENUECAT_WEBHOOK_AUTH_TOKEN')
+if not revenuecat_webhook_auth_token:
+	logger.error("REVENUECAT_WEBHOOK_AUTH_TOKEN is not set; RevenueCat webhooks will be rejected")
+revenuecat_webhook_authorization = f'Bearer {revenuecat_webhook_auth_token}' if revenuecat_webhook_auth_token else None
+
 @router.post('/webhook')
 async def handle_webhook(request: Request):
-	# Verify authorization header
+	# Verify authorization header (constant-time comparison)
 	auth_header = request.headers.get('Authorization')
-	if not auth_header or auth_header != 'Bearer soidhfshfs0pehf-hwr':
+	if not auth_header or not revenuecat_webhook_authorization or not hmac.compare_digest(auth_header, revenuecat_webhook_authorization):
 		raise HTTPException(status_code=401, detail='Unauthorized')
 
 	try:
-		webhook_data = await request.json()
+		webhook_data = orjson.loads(await read_webhook_body(request))
 		if not webhook_data:
 			raise HTTPException(status_code=400, detail='No webhook data')
 
@@ -31,36 +47,44 @@ async def handle_webhook(request: Request):
 		# Get the app_user_id which corresponds to auth_user_id in our system
 		auth_user_id = event.get('app_user_id')
 		if not auth_user_id:
-			print("EVENT DATA: ", event)
+			logger.warning("RevenueCat event without app_user_id: %s", event)
 			try:
 				sentry_sdk.set_extra("revenuecat_event", event)
 			except Exception as e:
-				print(f"Error capturing exception: {e}")
+				logger.error("Error capturing exception: %s", e)
 			sentry_sdk.capture_exception(Exception(f"RevenueCat webhook received without app_user_id. Event data: {event}"))
 			raise HTTPException(status_code=400, detail='No app_user_id provided')
 		
-		print("EVENT:", event)
-
-		# Handle different event types
-		if event_type in ['INITIAL_PURCHASE', 'RENEWAL', 'PRODUCT_CHANGE']:
-			print('handling successful purchase')
-			handle_successful_purchase(event)
-		elif event_type == 'CANCELLATION':
-			print('handling cancellation')
-			handle_cancellation(event)
-		elif event_type == 'EXPIRATION':
-			print('handling expiration')
-			handle_expiration(event)
-		else:
-			print(f"Unhandled event type: {event_type}")
+		# Lazy formatting, so the event dict is only stringified when debug logging is on
+		logger.debug("EVENT: %s", event)
+
+		# RevenueCat retries events until it gets a 200; acknowledge ones already handled without re-running side effects
+		event_id = event.get('id')
+		if await run_in_threadpool(ProcessedWebhookEvent.is_processed, "revenuecat", event_id):
+			logger.info("Event already processed: %s", event_id)
+			return {'status': 'success'}
+
+		if event_type not in revenuecat_event_handlers:
+			logger.info("Unhandled event type: %s", event_type)
 			return {'status': 'ignored'}
 
+		await handle_webhook_event("revenuecat", event_id, event_type, handle_revenuecat_event, event)
 		return {'status': 'success'}
 
+	except HTTPException:
+		raise
 	except Exception as e:
-		print(f"Error processing RevenueCat webhook: {str(e)}")
+		logger.exception("Error processing RevenueCat webhook")
 		raise HTTPException(status_code=500, detail=str(e)) from e
 
+def handle_revenuecat_event(event):
+	"""
+	Run the handler for a RevenueCat event type. Raises on failure so RevenueCat redelivers the event.
+	"""
+	event_type = event.get('type')
+	logger.debug('handling %s', event_type)
+	revenuecat_event_handlers[event_type](event)
+
 def handle_successful_purchase(event):
 	"""
 	Handle successful purchases and renewals
@@ -70,9 +94,7 @@ def handle_successful_purchase(event):
 		expiration_at_ms = event.get('expiration_at_ms')
 		event_user_email = event.get('subscriber_attributes', {}).get('$email', {}).get('value')
 
-		print('event_user_email', event_user_email)
-		print('auth_user_id', auth_user_id)
-		print('expiration_at_ms', expiration_at_ms)
+		logger.debug('event_user_email=%s auth_user_id=%s expiration_at_ms=%s', event_user_email, auth_user_id, expiration_at_ms)
 		
 		# Get existing subscription info
 		subscription = ConstellaSubscription.get_user_info(
@@ -80,7 +102,7 @@ def handle_successful_purchase(event):
 			auth_user_id=auth_user_id
 		)
 
-		print('existing subscription ', subscription)
+		logger.debug('existing subscription %s', subscription)
 
 		# Convert milliseconds to datetime
 		period_end = datetime.fromtimestamp(expiration_at_ms / 1000, tz=timezone.utc) if expiration_at_ms else None
@@ -94,7 +116,7 @@ def handle_successful_purchase(event):
 
 
 		if subscription:
-			print('updating existing subscription')
+			logger.debug('updating existing subscription')
 
 			# Update existing subscription
 			ConstellaSubscription.create_or_update_subscription_v2(
@@ -113,7 +135,7 @@ def handle_successful_purchase(event):
 			if subscription.get('email'):
 				update_contact_property(subscription['email'], "subscriptionStatus", "subscribed")
 		else:
-			print('creating new subscription')
+			logger.debug('creating new subscription')
 			# Create new subscription
 			new_sub = ConstellaSubscription.create_subscription(
 				stripe_customer_id=None,
@@ -130,7 +152,7 @@ def handle_successful_purchase(event):
 
 
 	except Exception as e:
-		print(f"Error handling successful purchase: {str(e)}")
+		logger.error("Error handling successful purchase: %s", e)
 		raise
 
 def handle_cancellation(event):
@@ -166,11 +188,7 @@ def handle_cancellation(event):
 		# Subtract the credits from this plan
 		stella_credits_removal = -1 * get_stella_credits(plan_name) 
 
-		subscription = ConstellaSubscription.get_user_info(
-			email=event_user_email,
-			auth_user_id=auth_user_id
-		)
-		
+		# Reuse the subscription fetched above; nothing has written it since
 		if subscription:
 			ConstellaSubscription.create_or_update_subscription_v2(
 				_id=str(subscription.get('_id')),
@@ -184,7 +202,7 @@ def handle_cancellation(event):
 			)
 
 	except Exception as e:
-		print(f"Error handling cancellation: {str(e)}")
+		logger.error("Error handling cancellation: %s", e)
 		raise
 
 def handle_expiration(event):
@@ -199,5 +217,13 @@ def handle_expiration(event):
 		# Now becoming in the past
 
 	except Exception as e:
-		print(f"Error handling expiration: {str(e)}")
-		raise
\ No newline at end of file
+		logger.error("Error handling expiration: %s", e)
+		raise
+
+revenuecat_event_handlers = {
+	'INITIAL_PURCHASE': handle_successful_purchase,
+	'RENEWAL': handle_successful_purchase,
+	'PRODUCT_CHANGE': handle_successful_purchase,
+	'CANCELLATION': handle_cancellation,
+	'EXPIRATION': handle_expiration,
+}
@@ -1,25 +1,30 @@
 from fastapi import APIRouter, WebSocketDisconnect, HTTPException, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.websockets import WebSocketState
+import asyncio
 import base64
+import httpx
+import io
 import time
 from pydantic import BaseModel, HttpUrl
-import requests
-import json
+import logging
 from typing import List, Dict, Optional
 from ai.stella.prompts import get_system_prompt
 import jwt
 import os
 from db.models.constella.constella_shared_view import ConstellaSharedView
 from fastapi.responses import JSONResponse
-import traceback
 from db.models.constella.frontend.node import Node
 from db.models.constella.frontend.edge import Edge
 from db.models.constella.frontend.viewport import Viewport
 from db.models.constella.frontend.message import Message
-from ai.openai_setup import openai_client
+from ai.openai_setup import async_openai_client, openai_client
 from websockets.exceptions import ConnectionClosedError
+from utils.graph_window import select_relevant_graph_slice
+from utils.websockets.fast_json import receive_orjson, send_orjson
 
-from ai.stella.assistants.assistant import (assistant_instructions, assistant_tools,
-	stella_openai_assistant, tool_capabilities_description)
+from ai.stella.assistants.assistant import (assistant_instructions, stella_openai_assistant,
+	tool_capabilities_description)
 from ai.stella.assistants.event_handler import stream_thread
 import ai.stella.assistants.tools.tool_implementations as tool_impls
 from db.models.constella.frontend.assistant_request import AssistantRequest
@@ -29,6 +34,8 @@ from ai.stella.assistants.tts import generate_speech
 from ai.ai_api import create_google_request, create_new_google_request
 from ai.stella.v2.cerebras_sonic import stream_cerebras_response, stream_openrouter_response
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
 	prefix="/stella",
 	tags=["stella"],
@@ -36,6 +43,46 @@ router = APIRouter(
 	# responses={404: {"description": "Not found"}},
 )
 
+# Shared async client so outbound calls reuse pooled connections and never block the event loop
+stella_http_client = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=32))
+
+# Base64 audio longer than this (~1 MB) is decoded off the event loop
+transcribe_inline_decode_max_chars = 1_000_000
+
+azure_speech_region = "eastus"
+# Azure speech tokens are valid for 10 minutes; reuse one for 9 and refresh 30s before that
+azure_speech_token_ttl_seconds = 540
+azure_speech_token_refresh_margin_seconds = 30
+azure_speech_token_cache = {"token": None, "expires_at": 0.0}
+azure_speech_token_lock = asyncio.Lock()
+
+# Voice-convo remarks are spoken while the assistant works, so they must arrive quickly
+voice_convo_response_timeout_seconds = 3
+voice_convo_fallback_response = "Let me take a look at that."
+
+# Fixed part of the voice-convo prompt, built once; each turn only appends the user's graph data
+voice_convo_instructions = f"""You are Stella, a human being in a conversation with the user regarding their knowledge base.
+{tool_capabilities_description}
+Never greet the user as you are already in the middle of the conversation. Do not introduce yourself at all but be specific related to the task and speak straight to the point as to what you are doing.
+Mention specific details about the topic they mentioned, not generic things like "I am helping", "I am creating notes", etc. but make specific remarks conversationally on that topic.
+Look at their current graph view and the user's message and use that to make an interesting remark and tie in what you are doing to help them.
+Do not mention specific details about what you are doing but rather on the content of what they asked in regards to their graph view as you do it.
+Generate a single sentence user in the present continuous tense of what you are doing currently as if you are doing it.
+Never say anything like "looking through the notes", this is already known.
+However, if the user asks a general question or information request, then simply mention 'let me analyze', 'let me think', 'looking through', etc.
+"""
+
+# Text around the per-turn graph data in the voice-convo prompt, so each turn only concatenates
+voice_convo_prompt_prefix = voice_convo_instructions + "This message is about always their notes and current graph view. This is the data regarding that:\n"
+voice_convo_prompt_suffix = "\nYour single sentence response in the user's language:\n"
+
+# TTS has max input of 2k tokens, so we'll do 4k chars as safety (~1k words)
+tts_max_input_chars = 4000
+# Audio is read from OpenAI in 4 KB chunks and sent in frames of up to 8 KB, or after 100ms
+tts_read_chunk_bytes = 4096
+tts_frame_bytes = 8192
+tts_frame_flush_seconds = 0.1
+
 
 def parse_websocket_request(req: dict) -> AssistantRequest:
 	"""Parse incoming websocket JSON request into AssistantRequest format"""
@@ -57,25 +104,101 @@ async def safe_websocket_send(websocket: WebSocket, message_type: str, data):
 	Returns True if successful, False if connection is closed.
 	"""
 	try:
-		# Check if websocket is still connected
-		if hasattr(websocket, 'client_state') and websocket.client_state.name != 'CONNECTED':
+		# Check if websocket is still connected (enum identity check, this runs for every streamed frame)
+		if websocket.client_state is not WebSocketState.CONNECTED:
 			return False
 			
 		if message_type == 'text':
 			await websocket.send_text(data)
 		elif message_type == 'json':
-			await websocket.send_json(data)
+			await send_orjson(websocket, data)
 		elif message_type == 'bytes':
 			await websocket.send_bytes(data)
 		return True
 	except ConnectionClosedError:
-		print(f"WebSocket connection closed while sending {message_type} message")
+		logger.info("WebSocket connection closed while sending %s message", message_type)
+		return False
+	except Exception as e:
+		logger.warning("Error sending %s message over websocket: %s", message_type, e)
+		return False
+
+
+async def safe_websocket_send_text(websocket: WebSocket, data: str) -> bool:
+	"""Text-only safe_websocket_send for per-token loops, skipping the message type dispatch"""
+	try:
+		if websocket.client_state is not WebSocketState.CONNECTED:
+			return False
+		await websocket.send_text(data)
+		return True
+	except ConnectionClosedError:
+		logger.info("WebSocket connection closed while sending text message")
+		return False
+	except Exception as e:
+		logger.warning("Error sending text message over websocket: %s", e)
+		return False
+
+
+async def safe_websocket_send_bytes(websocket: WebSocket, data: bytes) -> bool:
+	"""Bytes-only safe_websocket_send for audio frame loops, skipping the message type dispatch"""
+	try:
+		if websocket.client_state is not WebSocketState.CONNECTED:
+			return False
+		await websocket.send_bytes(data)
+		return True
+	except ConnectionClosedError:
+		logger.info("WebSocket connection closed while sending bytes message")
 		return False
 	except Exception as e:
-		print(f"Error sending {message_type} message over websocket: {e}")
+		logger.warning("Error sending bytes message over websocket: %s", e)
 		return False
 
 
+def format_graph_message(request_data: AssistantRequest) -> str:
+	"""
+	Build the last user message with the graph data.
+	The bulky graph state that changes least between turns comes first and the per-turn viewport
+	and request last, so consecutive turns share the longest possible prompt prefix for provider caching.
+	Large graphs are cut down to the slice around the viewport.
+	"""
+	nodes, edges = select_relevant_graph_slice(request_data.nodes, request_data.edges, request_data.viewport)
+	return f"""All of user's tags:{request_data.tags}
+				Nodes on user's graph:{nodes}
+				Edges on user's graph:{edges}
+				Viewport on user's graph:{request_data.viewport}
+				User's request: {request_data.user_message}
+				"""
+
+
+async def stream_speech_to_websocket(websocket: WebSocket, text: str, model: str = "gpt-4o-mini-tts") -> bool:
+	"""
+	Stream the mp3 speech for text over the websocket as it is synthesized.
+	Uses the async OpenAI client, so other websockets on this worker keep being served during synthesis.
+	Returns False if the websocket closed mid-stream.
+	"""
+	# Chunks are coalesced into larger frames to cut websocket framing and send overhead, but a frame
+	# is never held back longer than the flush deadline so playback can start promptly
+	buffer = bytearray()
+	buffer_started_at = 0.0
+	async with async_openai_client.audio.speech.with_streaming_response.create(
+		model=model,
+		voice="sage",
+		response_format="mp3",
+		input=text[:tts_max_input_chars],
+	) as audio_response:
+		async for chunk in audio_response.iter_bytes(chunk_size=tts_read_chunk_bytes):
+			if not buffer:
+				buffer_started_at = time.monotonic()
+			buffer.extend(chunk)
+			if len(buffer) >= tts_frame_bytes or time.monotonic() - buffer_started_at >= tts_frame_flush_seconds:
+				if not await safe_websocket_send_bytes(websocket, bytes(buffer)):
+					return False
+				buffer.clear()
+
+	if buffer and not await safe_websocket_send_bytes(websocket, bytes(buffer)):
+		return False
+	return True
+
+
 @router.websocket("/assistant")
 async def websocket_assistant(websocket: WebSocket):
 	await websocket.accept()
@@ -86,7 +209,7 @@ async def websocket_assistant(websocket: WebSocket):
 		while True:
 
 			# Receive the request data as JSON
-			req = await websocket.receive_json()
+			req = await receive_orjson(websocket)
 
 			# Parse the request data into our expected format
 			request_data = parse_websocket_request(req)
@@ -102,31 +225,22 @@ async def websocket_assistant(websocket: WebSocket):
 			if not await safe_websocket_send(websocket, 'text', '|INIT|'):
 				break
 
-			full_message = ""
-			async def stream_response_back(response):
-				await safe_websocket_send(websocket, 'text', response.text.value)
-
 			# Arguments that get passed all the way to to the tool execution
 			extra_args = {
 				"tenant_name": request_data.tenant_name,
 				"websocket_tool_io": websocket
 			}
 
-			# Send progress updates to the frontend
-			def progress_callback(tool_call):
-				pass
-
-
-			response = stream_thread(thread=thread, assistant_id=stella_openai_assistant.id, content=request_data.user_message, tools=tool_impls, extra_args=extra_args, progress_callback=progress_callback)
+			response = stream_thread(thread=thread, assistant_id=stella_openai_assistant.id, content=request_data.user_message, tools=tool_impls, extra_args=extra_args)
+			client_connected = True
 			try:
 				async for token in response:
-					full_message += token.text.value
-					if not await safe_websocket_send(websocket, 'text', token.text.value):
+					if not await safe_websocket_send_text(websocket, token.text.value):
+						client_connected = False
 						break
 			except Exception as stream_error:
 				# Log the streaming error
-				print(f"Error during streaming: {stream_error}")
-				traceback.print_exc()
+				logger.exception("Error during streaming: %s", stream_error)
 				
 				# Send error message to frontend only if connection is still active
 				error_msg = {
@@ -139,15 +253,19 @@ async def websocket_assistant(websocket: WebSocket):
 				# Send completion signal even on error
 				continue
 
+			# The client is gone, so stop here instead of sending the rest of the turn into a closed socket
+			if not client_connected:
+				break
+
 			# Send completion signal
 			await safe_websocket_send(websocket, 'text', '|DONE_STREAMING|')
 
 	except WebSocketDisconnect:
 		pass
 	except ConnectionClosedError:
-		print("WebSocket connection closed by client")
+		logger.info("WebSocket connection closed by client")
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella websocket")
 		# Only try to send error if connection might still be active
 		await safe_websocket_send(websocket, 'json', {"error": str(e)})
 
@@ -159,7 +277,7 @@ async def websocket_assistant(websocket: WebSocket):
 		while True:
 
 			# Receive the request data as JSON
-			req = await websocket.receive_json()
+			req = await receive_orjson(websocket)
 
 			# Parse the request data into our expected format
 			request_data = parse_websocket_request(req)
@@ -168,10 +286,6 @@ async def websocket_assistant(websocket: WebSocket):
 			if not await safe_websocket_send(websocket, 'text', '|INIT|'):
 				break
 
-			full_message = ""
-			async def stream_response_back(response):
-				await websocket.send_text(response.text.value)
-
 			# Arguments that get passed all the way to to the tool execution
 			extra_args = {
 				"tenant_name": request_data.tenant_name,
@@ -179,12 +293,7 @@ async def websocket_assistant(websocket: WebSocket):
 			}
 
 			# Add graph data to the last message
-			request_data.messages[-1]['content'] = f"""User's request: {request_data.user_message}
-				Nodes on user's graph:{request_data.nodes}
-				Edges on user's graph:{request_data.edges}
-				Viewport on user's graph:{request_data.viewport}
-				All of user's tags:{request_data.tags}
-				"""
+			request_data.messages[-1]['content'] = format_graph_message(request_data)
 
 			try:				
 				message_resp = await stream_cerebras_response(messages=request_data.messages, extra_args=extra_args, system_prompt=assistant_instructions)
@@ -199,15 +308,8 @@ async def websocket_assistant(websocket: WebSocket):
 					if not await safe_websocket_send(websocket, 'text', '|AUDIO_START|'):
 						break
 					try:
-						with openai_client.audio.speech.with_streaming_response.create(
-							model="gpt-4o-mini-tts",
-							voice="sage",
-							response_format="mp3",
-							input=message_resp[:4000], # Has max input of 2k tokens, so we'll do 4k chars as safety (~1k words)
-						) as audio_response:
-							for chunk in audio_response.iter_bytes(chunk_size=1024):
-								if not await safe_websocket_send(websocket, 'bytes', chunk):
-									break
+						if not await stream_speech_to_websocket(websocket, message_resp):
+							break
 
 						if not await safe_websocket_send(websocket, 'text', '|AUDIO_END|'):
 							break
@@ -215,13 +317,13 @@ async def websocket_assistant(websocket: WebSocket):
 						if not await safe_websocket_send(websocket, 'text', '|DONE_STREAMING|'):
 							break
 					except Exception as e:
-						traceback.print_exc()
-						await safe_websocket_send(websocket, 'text', '|AUDIO_ERROR|')
+						logger.exception("Error streaming audio response")
+						if not await safe_websocket_send(websocket, 'text', '|AUDIO_ERROR|'):
+							break
 
 			except Exception as stream_error:
 				# Log the streaming error
-				print(f"Error during streaming: {stream_error}")
-				traceback.print_exc()
+				logger.exception("Error during streaming: %s", stream_error)
 				
 				# Send error message to frontend only if connection is still active
 				error_msg = {
@@ -240,9 +342,9 @@ async def websocket_assistant(websocket: WebSocket):
 	except WebSocketDisconnect:
 		pass
 	except ConnectionClosedError:
-		print("WebSocket connection closed by client")
+		logger.info("WebSocket connection closed by client")
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella websocket")
 		# Only try to send error if connection might still be active
 		await safe_websocket_send(websocket, 'json', {"error": str(e)})
 
@@ -254,7 +356,7 @@ async def websocket_assistant_openrouter(websocket: WebSocket):
 		while True:
 
 			# Receive the request data as JSON
-			req = await websocket.receive_json()
+			req = await receive_orjson(websocket)
 
 			# Parse the request data into our expected format
 			request_data = parse_websocket_request(req)
@@ -263,10 +365,6 @@ async def websocket_assistant_openrouter(websocket: WebSocket):
 			if not await safe_websocket_send(websocket, 'text', '|INIT|'):
 				break
 
-			full_message = ""
-			async def stream_response_back(response):
-				await websocket.send_text(response.text.value)
-
 			# Arguments that get passed all the way to to the tool execution
 			extra_args = {
 				"tenant_name": request_data.tenant_name,
@@ -274,12 +372,7 @@ async def websocket_assistant_openrouter(websocket: WebSocket):
 			}
 
 			# Add graph data to the last message
-			request_data.messages[-1]['content'] = f"""User's request: {request_data.user_message}
-				Nodes on user's graph:{request_data.nodes}
-				Edges on user's graph:{request_data.edges}
-				Viewport on user's graph:{request_data.viewport}
-				All of user's tags:{request_data.tags}
-				"""
+			request_data.messages[-1]['content'] = format_graph_message(request_data)
 
 			try:				
 				message_resp = await stream_openrouter_response(messages=request_data.messages, extra_args=extra_args, system_prompt=assistant_instructions)
@@ -294,15 +387,8 @@ async def websocket_assistant_openrouter(websocket: WebSocket):
 					if not await safe_websocket_send(websocket, 'text', '|AUDIO_START|'):
 						break
 					try:
-						with openai_client.audio.speech.with_streaming_response.create(
-							model="gpt-4o-mini-tts",
-							voice="sage",
-							response_format="mp3",
-							input=message_resp[:4000], # Has max input of 2k tokens, so we'll do 4k chars as safety (~1k words,
-						) as audio_response:
-							for chunk in audio_response.iter_bytes(chunk_size=1024):
-								if not await safe_websocket_send(websocket, 'bytes', chunk):
-									break
+						if not await stream_speech_to_websocket(websocket, message_resp):
+							break
 
 						if not await safe_websocket_send(websocket, 'text', '|AUDIO_END|'):
 							break
@@ -310,13 +396,13 @@ async def websocket_assistant_openrouter(websocket: WebSocket):
 						if not await safe_websocket_send(websocket, 'text', '|DONE_STREAMING|'):
 							break
 					except Exception as e:
-						traceback.print_exc()
-						await safe_websocket_send(websocket, 'text', '|AUDIO_ERROR|')
+						logger.exception("Error streaming audio response")
+						if not await safe_websocket_send(websocket, 'text', '|AUDIO_ERROR|'):
+							break
 
 			except Exception as stream_error:
 				# Log the streaming error
-				print(f"Error during streaming: {stream_error}")
-				traceback.print_exc()
+				logger.exception("Error during streaming: %s", stream_error)
 				
 				# Send error message to frontend only if connection is still active
 				error_msg = {
@@ -335,9 +421,9 @@ async def websocket_assistant_openrouter(websocket: WebSocket):
 	except WebSocketDisconnect:
 		pass
 	except ConnectionClosedError:
-		print("WebSocket connection closed by client")
+		logger.info("WebSocket connection closed by client")
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella websocket")
 		# Only try to send error if connection might still be active
 		await safe_websocket_send(websocket, 'json', {"error": str(e)})
 
@@ -351,7 +437,7 @@ async def initial_message_audio(request: InitialMessageAudioIn):
 	try:
 		pass
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella route")
 		raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -359,32 +445,37 @@ async def initial_message_audio(request: InitialMessageAudioIn):
 @router.post("/get-azure-speech-token")
 async def get_speech_token():
 	try:
-		speech_key = os.getenv('AZURE_SPEECH_KEY', '')
-		speech_region = "eastus"
+		# Azure speech tokens live 10 minutes, so one token is shared by all callers until shortly before it expires
+		async with azure_speech_token_lock:
+			if time.time() >= azure_speech_token_cache["expires_at"] - azure_speech_token_refresh_margin_seconds:
+				speech_key = os.getenv('AZURE_SPEECH_KEY', '')
+
+				headers = {
+					"Ocp-Apim-Subscription-Key": speech_key,
+					"Content-Type": "application/x-www-form-urlencoded"
+				}
 
-		headers = {
-			"Ocp-Apim-Subscription-Key": speech_key,
-			"Content-Type": "application/x-www-form-urlencoded"
-		}
+				response = await stella_http_client.post(
+					f"https://{azure_speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken",
+					headers=headers
+				)
 
-		response = requests.post(
-			f"https://{speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken",
-			headers=headers
-		)
+				if response.status_code != 200:
+					raise HTTPException(
+						status_code=401,
+						detail="There was an error authorizing your speech key."
+					)
+
+				azure_speech_token_cache["token"] = response.text
+				azure_speech_token_cache["expires_at"] = time.time() + azure_speech_token_ttl_seconds
 
-		if response.status_code == 200:
 			return {
-				"token": response.text,
-				"region": speech_region
+				"token": azure_speech_token_cache["token"],
+				"region": azure_speech_region
 			}
-		else:
-			raise HTTPException(
-				status_code=401,
-				detail="There was an error authorizing your speech key."
-			)
 
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella route")
 		raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -399,29 +490,24 @@ async def transcribe_audio(request: Request):
 		if 'base64,' in audio_base64:
 			audio_base64 = audio_base64.split('base64,')[1]
 
-		# Decode base64 to bytes
-		audio_bytes = base64.b64decode(audio_base64)
-
-		temp_file_path = '/tmp/audio.webm'
-
-		# Write to temporary file
-		with open('/tmp/audio.webm', 'wb') as f:
-			f.write(audio_bytes)
-
-		# Open file and transcribe with Whisper
-		with open(temp_file_path, "rb") as audio_file:
-			transcript = openai_client.audio.transcriptions.create(
-				model="whisper-1",
-				file=audio_file
-			)
-
-		# Clean up temp file
-		os.unlink(temp_file_path)
+		# Decode base64 to bytes (large recordings are decoded in the threadpool to keep the loop free)
+		if len(audio_base64) > transcribe_inline_decode_max_chars:
+			audio_bytes = await run_in_threadpool(base64.b64decode, audio_base64)
+		else:
+			audio_bytes = base64.b64decode(audio_base64)
+
+		# Transcribe with Whisper from memory; the name tells the API the container format
+		audio_file = io.BytesIO(audio_bytes)
+		audio_file.name = "audio.webm"
+		transcript = await async_openai_client.audio.transcriptions.create(
+			model="whisper-1",
+			file=audio_file
+		)
 
 		return {"text": transcript.text}
 
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella route")
 		raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -484,7 +570,7 @@ Return only the valid JSON:"""
             raise HTTPException(status_code=500, detail="Failed to fix JSON")
             
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Error fixing JSON")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.websocket("/voice-convo")
@@ -493,7 +579,7 @@ async def websocket_voice_convo(websocket: WebSocket):
 	try:
 		while True:
 			# Receive the request data as JSON
-			req = await websocket.receive_json()
+			req = await receive_orjson(websocket)
 
 			# Check if message_to_speak is provided
 			message_to_speak = req.get('message_to_speak')
@@ -505,46 +591,39 @@ async def websocket_voice_convo(websocket: WebSocket):
 				# Parse the request data into our expected format
 				request_data = parse_websocket_request(req)
 
-				# Format the available tools into a readable string
-				available_tools = []
-				for tool in assistant_tools:
-					tool_name = tool.get('function', {}).get('name', 'Unknown')
-					tool_desc = tool.get('function', {}).get('description', 'No description')
-					available_tools.append(f"- {tool_name}: {tool_desc}")
-				
-				tools_text = "\n".join(available_tools)
+				# Create the prompt for Google Flash Lite (fixed instructions first and per-turn graph data last,
+				# so the instruction prefix is identical across calls and can be served from the prompt cache)
+				google_prompt = voice_convo_prompt_prefix + get_prompt_instructions_from_user_data_for_voice_convo(request_data) + voice_convo_prompt_suffix
 
-				# Create the prompt for Google Flash Lite
-				google_prompt = f"""You are Stella, a human being in a conversation with the user regarding their knowledge base.
-{tool_capabilities_description}
-Never greet the user as you are already in the middle of the conversation. Do not introduce yourself at all but be specific related to the task and speak straight to the point as to what you are doing.
-Mention specific details about the topic they mentioned, not generic things like "I am helping", "I am creating notes", etc. but make specific remarks conversationally on that topic.
-This message is about always their notes and current graph view. This is the data regarding that:
-{get_prompt_instructions_from_user_data_for_voice_convo(request_data)}
-Look at their current graph view and the user's message and use that to make an interesting remark and tie in what you are doing to help them.
-Do not mention specific details about what you are doing but rather on the content of what they asked in regards to their graph view as you do it.
-Generate a single sentence user in the present continuous tense of what you are doing currently as if you are doing it.
-Never say anything like "looking through the notes", this is already known.
-However, if the user asks a general question or information request, then simply mention 'let me analyze', 'let me think', 'looking through', etc.
-Your single sentence response in the user's language:
-"""
-
-				# Call Google Flash Lite for fast voice response
+				# Call Google Flash Lite for fast voice response. Thinking is disabled since this is a
+				# single spoken sentence, and the blocking SDK call runs in the threadpool to keep the loop free
 				try:
-					response = create_new_google_request(
-						prompt=google_prompt,
-						model_name="gemini-2.5-flash-preview-04-17",
+					# A late remark is worse than a generic one, so past the deadline a fallback line is spoken instead.
+					# wait_for only stops the await; the request's own HTTP timeout ends the threadpool call too,
+					# so timed-out calls don't pile up holding threadpool tokens
+					response = await asyncio.wait_for(
+						run_in_threadpool(
+							create_new_google_request,
+							prompt=google_prompt,
+							model_name="gemini-2.5-flash-preview-04-17",
+							thinking_budget_tokens=0,
+							timeout_seconds=voice_convo_response_timeout_seconds,
+						),
+						timeout=voice_convo_response_timeout_seconds,
 					)
 
 
-					print('Response: ' + response)
+					logger.debug("Voice response: %s", response)
 					
 					if not response:
-						print("No response from Google Flash Lite")
+						logger.warning("No response from Google Flash Lite")
 						response = "Sorry, I couldn't generate a response at this time."
 						
+				except asyncio.TimeoutError:
+					logger.warning("Google Flash Lite response timed out, using fallback")
+					response = voice_convo_fallback_response
 				except Exception as e:
-					print(f"Error calling Google Flash Lite: {e}")
+					logger.warning("Error calling Google Flash Lite: %s", e)
 					response = "Error generating voice response."
 
 			# Send the text response
@@ -559,27 +638,21 @@ Your single sentence response in the user's language:
 				convo_mode_enabled = req.get('convo_mode_enabled', True)
 
 			if convo_mode_enabled:
-				print("Streaming audio")
+				logger.debug("Streaming audio")
 				# Stream the audio data to the client
 				if not await safe_websocket_send(websocket, 'text', '|AUDIO_START|'):
 					break
 
 				try:
-					with openai_client.audio.speech.with_streaming_response.create(
-						model="tts-1",
-						voice="sage",
-						response_format="mp3",
-						input=response,
-					) as audio_response:
-						for chunk in audio_response.iter_bytes(chunk_size=1024):
-							if not await safe_websocket_send(websocket, 'bytes', chunk):
-								break
+					if not await stream_speech_to_websocket(websocket, response, model="tts-1"):
+						break
 
 					if not await safe_websocket_send(websocket, 'text', '|AUDIO_END|'):
 						break
 				except Exception as audio_error:
-					print(f"Error during audio streaming: {audio_error}")
-					await safe_websocket_send(websocket, 'text', '|AUDIO_ERROR|')
+					logger.warning("Error during audio streaming: %s", audio_error)
+					if not await safe_websocket_send(websocket, 'text', '|AUDIO_ERROR|'):
+						break
 
 			# Send completion signal
 			await safe_websocket_send(websocket, 'text', '|DONE_STREAMING|')
@@ -587,8 +660,8 @@ Your single sentence response in the user's language:
 	except WebSocketDisconnect:
 		pass
 	except ConnectionClosedError:
-		print("WebSocket connection closed by client")
+		logger.info("WebSocket connection closed by client")
 	except Exception as e:
-		traceback.print_exc()
+		logger.exception("Error in stella websocket")
 		# Only try to send error if connection might still be active
 		await safe_websocket_send(websocket, 'json', {"error": str(e)})
@@ -1,5 +1,6 @@
 import json
 from fastapi import APIRouter, WebSocketDisconnect, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, HttpUrl
 from fastapi import WebSocket
 from ai.ai_api import stream_anthropic_response, stream_google_response
@@ -38,8 +39,8 @@ async def deep_find(req: DeepFindReq, background_tasks: BackgroundTasks):
 	Uses background tasks and long job tracking for asynchronous processing.
 	"""
 	try:
-		# Create a long job to track the progress
-		long_job_id = LongJob.insert('started', [], type='deep-find')
+		# Create a long job to track the progress (sync Mongo call, so run it in the threadpool)
+		long_job_id = await run_in_threadpool(LongJob.insert, 'started', [], type='deep-find')
 
 		# if url does not start with https://www., add it
 		if not str(req.url).startswith("https://"):
@@ -73,8 +74,9 @@ async def process_deep_find(
 	Background task to process the deep find request and update the long job status.
 	"""
 	try:
-		# Update job status to processing
-		LongJob.update_status(long_job_id, "processing")
+		# Update job status to processing (LongJob calls are sync Mongo writes, so they run in the
+		# threadpool to keep this background task from stalling the event loop)
+		await run_in_threadpool(LongJob.update_status, long_job_id, "processing")
 		
 		# Call the crawl function from df.py
 		result = await df.crawl_website_for_information(
@@ -86,13 +88,13 @@ async def process_deep_find(
 		)
 		
 		# Update the long job with the results
-		LongJob.update_status(long_job_id, "completed", result)
+		await run_in_threadpool(LongJob.update_status, long_job_id, "completed", result)
 		
 	except Exception as e:
 		print(f"Error in deep find process: {str(e)}")
 		traceback.print_exc()
 		# Update job status to error
-		LongJob.update_status(long_job_id, "error", {"error": str(e)})
+		await run_in_threadpool(LongJob.update_status, long_job_id, "error", {"error": str(e)})
 
 
 @router.get("/job-status/{job_id}")
@@ -108,7 +110,7 @@ async def get_job_status(job_id: str):
     """
     try:
         # Get the job data with full object
-        job_data = LongJob.get_status(job_id, return_object=True)
+        job_data = await run_in_threadpool(LongJob.get_status, job_id, return_object=True)
         
         if not job_data:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -44,6 +44,14 @@ def setup_mongodb_uri():
         print("❌ Invalid URI format. Should start with 'mongodb://' or 'mongodb+srv://'")
         return None
     
+    # Catch malformed URIs right away instead of after the server selection timeout
+    try:
+        from pymongo.uri_parser import parse_uri
+        parse_uri(mongodb_uri)
+    except Exception as e:
+        print(f"❌ Invalid URI: {e}")
+        return None
+    
     # Test the connection
     print("\n🔄 Testing connection...")
     success = test_mongodb_connection(mongodb_uri)
@@ -80,10 +88,13 @@ def test_mongodb_connection(uri):
             serverSelectionTimeoutMS=10000,  # Shorter timeout for testing
             connectTimeoutMS=5000,
             socketTimeoutMS=5000,
+            localThresholdMS=15,
+            heartbeatFrequencyMS=10000,
+            appname="constella-setup-wizard",  # Lets Atlas logs attribute these probes
         )
         
-        # Test ping
-        client.admin.command('ping')
+        # Test ping, preferring the primary so the result reflects whether writes will work
+        client.admin.command('ping', read_preference=ReadPreference.PRIMARY_PREFERRED)
         client.close()
         
         return True
@@ -107,8 +118,9 @@ def save_to_profile(uri):
         # Check if URI is already in profile
         if os.path.exists(profile_file):
             with open(profile_file, 'r') as f:
-                content = f.read()
-                if 'MONGODB_URI' in content:
+                # Only an actual export counts, not a mention in a comment
+                exists = any(line.lstrip().startswith("export MONGODB_URI=") for line in f)
+                if exists:
                     print(f"⚠️  MONGODB_URI already exists in {profile_file}")
                     replace = input("Replace existing entry? (y/n): ").lower().strip()
                     if replace != 'y':
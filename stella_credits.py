@@ -1,41 +1,13 @@
-from datetime import datetime
 from db.models.constella.constella_subscription import ConstellaSubscription
 from fastapi import HTTPException
 
 def add_credits_to_active_subscriptions():
 	try:
-		# Get all subscriptions
-		all_subscriptions = ConstellaSubscription.get_all()
+		# Filter and write server-side in one round trip instead of fetching and updating every row
+		updated_count = ConstellaSubscription.set_plan_for_active_subscriptions_without_plan("pro_monthly")
+		# Skipped means inactive (no period_end or expired); active rows that already have a plan are neither
+		skipped_count = ConstellaSubscription.count_inactive_subscriptions()
 		
-		# Track results
-		updated_count = 0
-		skipped_count = 0
-		
-		# Process each subscription
-		for sub in all_subscriptions:
-			# Skip if no period_end
-			if not sub.get('period_end'):
-				skipped_count += 1
-				continue
-				
-			# Convert period_end string to datetime if needed
-			if isinstance(sub['period_end'], str):
-				period_end = datetime.strptime(sub['period_end'], "%Y-%m-%dT%H:%M:%SZ")
-			else:
-				period_end = sub['period_end']
-				
-			# Check if subscription is active
-			if period_end > datetime.now():
-				# Check if plan is empty or null and update to pro_monthly if needed
-				plan_name = sub.get('plan_name')
-				if plan_name is None or plan_name == '':
-					print('updating empty plan to pro_monthly for: ', sub['email'])
-					ConstellaSubscription.update_plan(str(sub['_id']), "pro_monthly")
-					updated_count += 1
-					continue
-			else:
-				skipped_count += 1
-				
 		return {
 			"status": "success",
 			"updated_subscriptions": updated_count,
@@ -0,0 +1,48 @@
+import tempfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+pdfium = pytest.importorskip("pypdfium2")
+
+from routers.misc import helpers
+
+
+def build_pdf(text: str) -> bytes:
+    """Minimal single-page PDF drawing text in Helvetica"""
+    content = f"BT /F1 24 Tf 20 100 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 200] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(pdf)
+
+
+def test_parse_pdf_file_uses_pdfium_for_spooled_downloads(monkeypatch):
+    # download_pdf / read_pdf_from_url hand parse_pdf_file a SpooledTemporaryFile; it must go through PDFium
+    def fail_pypdf2(pdf_file):
+        raise AssertionError("fell back to PyPDF2")
+
+    monkeypatch.setattr(helpers, "extract_page_texts_pypdf2", fail_pypdf2)
+
+    with tempfile.SpooledTemporaryFile(max_size=helpers.pdf_spool_max_memory_bytes) as pdf_file:
+        pdf_file.write(build_pdf("Hello Constella"))
+        pdf_file.seek(0)
+        text, num_pages = helpers.parse_pdf_file(pdf_file)
+
+    assert num_pages == 1
+    assert "Hello Constella" in text
@@ -23,17 +23,25 @@ def get_plan_name(revenuecat_product_id: str = '', stripe_product_id: str = ''):
 	else:
 		return 'starter_monthly'
 
+# Stripe price id -> (plan name, monthly stella credits), built once at import
+stripe_price_id_plans = {
+	stripe_ultra_yearly_price_id: ('ultra_yearly', ultra_stella_credits),
+	stripe_ultra_monthly_price_id: ('ultra_monthly', ultra_stella_credits),
+	stripe_horizon_monthly_price_id: ('ultra_monthly', ultra_stella_credits),
+	stripe_starter_yearly_price_id: ('starter_yearly', starter_stella_credits),
+	stripe_starter_monthly_price_id: ('starter_monthly', starter_stella_credits),
+}
+# Unknown price ids keep the legacy plan name with starter credits
+default_stripe_price_id_plan = ('pro_monthly', starter_stella_credits)
+
+def get_plan_from_stripe_price_id(stripe_price_id: str):
+	"""
+	Get the (plan name, stella credits) for a stripe price id in a single lookup
+	"""
+	return stripe_price_id_plans.get(stripe_price_id, default_stripe_price_id_plan)
+
 def get_plan_name_from_stripe_price_id(stripe_price_id: str):
-	if stripe_price_id == stripe_ultra_yearly_price_id:
-		return 'ultra_yearly'
-	elif stripe_price_id == stripe_ultra_monthly_price_id or stripe_price_id == stripe_horizon_monthly_price_id:
-		return 'ultra_monthly'
-	elif stripe_price_id == stripe_starter_yearly_price_id:
-		return 'starter_yearly'
-	elif stripe_price_id == stripe_starter_monthly_price_id:
-		return 'starter_monthly'
-	else:
-		return 'pro_monthly'
+	return get_plan_from_stripe_price_id(stripe_price_id)[0]
 
 def get_stella_credits(plan_name: str):
 	if 'starter' in plan_name:
@@ -47,11 +55,4 @@ def get_stella_credits_from_stripe_price_id(stripe_price_id: str):
 	"""
 	Get the stella credits from the stripe price id
 	"""
-	try:
-		if stripe_price_id == stripe_ultra_yearly_price_id or stripe_price_id == stripe_ultra_monthly_price_id or stripe_price_id == stripe_horizon_monthly_price_id:
-			return ultra_stella_credits
-		else:
-			return starter_stella_credits
-	except Exception as e:
-		print(f"Error getting stella credits from stripe product id: {e}")
-		return starter_stella_credits
\ No newline at end of file
+	return get_plan_from_stripe_price_id(stripe_price_id)[1]
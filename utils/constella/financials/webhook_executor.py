@@ -0,0 +1,42 @@
+import logging
+import sentry_sdk
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from db.models.constella.processed_webhook_event import ProcessedWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# Provider event payloads are a few KB; anything far larger is not a genuine event
+max_webhook_body_bytes = 1_000_000
+
+
+async def read_webhook_body(request: Request) -> bytes:
+	"""
+	Read a webhook body chunk by chunk, rejecting it with 413 as soon as it exceeds max_webhook_body_bytes.
+	Unlike a Content-Length check alone, this also bounds chunked requests that declare no length.
+	"""
+	if int(request.headers.get('content-length') or 0) > max_webhook_body_bytes:
+		raise HTTPException(status_code=413, detail="Payload too large")
+
+	body = bytearray()
+	async for chunk in request.stream():
+		body.extend(chunk)
+		if len(body) > max_webhook_body_bytes:
+			raise HTTPException(status_code=413, detail="Payload too large")
+	return bytes(body)
+
+
+async def handle_webhook_event(source: str, event_id: str, event_type: str, handler, event):
+	"""
+	Run the handler for a verified webhook event before responding, in the threadpool since handlers make
+	blocking Stripe / Loops / Mongo calls. The event is recorded as processed only after handler succeeds;
+	on failure this raises a 500 so the provider redelivers it, which keeps the retry durable across restarts.
+	"""
+	try:
+		await run_in_threadpool(handler, event)
+	except Exception as e:
+		logger.exception("%s webhook %s (%s) failed", source, event_id, event_type)
+		sentry_sdk.capture_exception(e)
+		raise HTTPException(status_code=500, detail="Webhook handling failed") from e
+
+	await run_in_threadpool(ProcessedWebhookEvent.mark_processed, source, event_id, event_type)
@@ -0,0 +1,30 @@
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Dedicated pool for long-running integration syncs (Readwise export, etc.) so they do not
+# occupy the shared threadpool FastAPI uses for sync endpoints and BackgroundTasks.
+# Threads rather than processes: the work is network/DB bound and the Mongo + Weaviate
+# clients are created at import time, which is not fork-safe.
+logger = logging.getLogger(__name__)
+
+max_sync_workers = int(os.getenv("INTEGRATION_SYNC_WORKERS", "4"))
+
+sync_executor = ThreadPoolExecutor(max_workers=max_sync_workers, thread_name_prefix="integration-sync")
+
+
+def _log_sync_job_error(future: Future):
+	"""Surface exceptions from fire-and-forget jobs, which would otherwise be swallowed"""
+	error = future.exception()
+	if error is not None:
+		logger.error("Integration sync job failed", exc_info=error)
+
+
+def submit_sync_job(func, *args, **kwargs) -> Future:
+	"""
+	Run a sync job on the integration sync pool without waiting for it.
+	Jobs are expected to report their own progress, e.g. through LongJob.update_status.
+	"""
+	future = sync_executor.submit(func, *args, **kwargs)
+	future.add_done_callback(_log_sync_job_error)
+	return future
@@ -0,0 +1,67 @@
+from typing import List, Tuple
+
+from db.models.constella.frontend.edge import Edge
+from db.models.constella.frontend.node import Node
+from db.models.constella.frontend.viewport import Viewport
+
+# Max notes from the user's graph embedded in a prompt; larger graphs are cut down to the part around the viewport
+max_graph_slice_nodes = 200
+
+# The client doesn't send its screen size, so the viewport center is estimated for a typical desktop window
+assumed_screen_width = 1440
+assumed_screen_height = 900
+
+
+def _distance_to_center(node: Node, center_x: float, center_y: float) -> float:
+	position = node.position
+	if position is None or position.x is None or position.y is None:
+		return float('inf')
+	return (position.x - center_x) ** 2 + (position.y - center_y) ** 2
+
+
+def select_relevant_graph_slice(
+	nodes: List[Node],
+	edges: List[Edge],
+	viewport: Viewport,
+	max_nodes: int = max_graph_slice_nodes,
+) -> Tuple[List[Node], List[Edge]]:
+	"""
+	Return the part of the user's graph worth putting in a prompt.
+	Graphs within max_nodes are returned as is. Larger ones keep the notes closest to the viewport center,
+	then their 1-hop neighbours, then the next closest notes, up to max_nodes. The slice is sorted by id
+	(and edges limited to those between kept notes) so the same view always formats to the same prompt text.
+	"""
+	if len(nodes) <= max_nodes:
+		return nodes, edges
+
+	# React Flow viewport: screen = graph * zoom + (x, y), so the screen center maps back into graph coordinates
+	zoom = viewport.zoom or 1
+	center_x = (assumed_screen_width / 2 - viewport.x) / zoom
+	center_y = (assumed_screen_height / 2 - viewport.y) / zoom
+	by_distance = sorted(nodes, key=lambda node: _distance_to_center(node, center_x, center_y))
+
+	# Half the budget goes to the notes in view, so their neighbours still fit
+	selected_ids = {node.id for node in by_distance[:max_nodes // 2]}
+	neighbour_ids = set()
+	for edge in edges:
+		if edge.source in selected_ids:
+			neighbour_ids.add(edge.target)
+		elif edge.target in selected_ids:
+			neighbour_ids.add(edge.source)
+
+	for node in by_distance[max_nodes // 2:]:
+		if len(selected_ids) >= max_nodes:
+			break
+		if node.id in neighbour_ids:
+			selected_ids.add(node.id)
+	for node in by_distance[max_nodes // 2:]:
+		if len(selected_ids) >= max_nodes:
+			break
+		selected_ids.add(node.id)
+
+	selected_nodes = sorted((node for node in nodes if node.id in selected_ids), key=lambda node: node.id)
+	selected_edges = sorted(
+		(edge for edge in edges if edge.source in selected_ids and edge.target in selected_ids),
+		key=lambda edge: edge.id or '',
+	)
+	return selected_nodes, selected_edges
@@ -1,3 +1,8 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
 class Logger:
     def __init__(self) -> None:
         pass
@@ -7,3 +12,23 @@ class Logger:
 
 
 logger = Logger()
+
+
+def setup_queue_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Route root logging through a queue so request handlers only do a non-blocking put;
+    a listener thread formats records and writes them to stderr.
+    Returns the started listener, which should be stopped on shutdown to flush the queue.
+    """
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(level)
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -75,6 +75,13 @@ def create_loops_contact(email: str, user_id: str, first_name: str = None, sourc
 
 
 def update_contact_property(email: str, property_name: str, property_value: str, api_key: str = None, call_for_horizon: bool = False):
+	update_contact_properties(email, {property_name: property_value}, api_key, call_for_horizon)
+
+
+def update_contact_properties(email: str, properties: dict, api_key: str = None, call_for_horizon: bool = False):
+	"""
+	Update several contact properties with a single Loops request
+	"""
 	try:
 		# Use provided api_key or default to loops_api_key
 		if api_key is None:
@@ -83,8 +90,8 @@ def update_contact_property(email: str, property_name: str, property_value: str,
 		url = "https://app.loops.so/api/v1/contacts/update"
 
 		payload = {
-			"email": email,
-			property_name: property_value
+			**properties,
+			"email": email
 		}
 		headers = {
 			"Authorization": f"Bearer {api_key}",
@@ -95,7 +102,7 @@ def update_contact_property(email: str, property_name: str, property_value: str,
 		
 		# Call again with horizon API key if requested and not already using it
 		if call_for_horizon and api_key != horizon_loops_api_key:
-			update_contact_property(email, property_name, property_value, horizon_loops_api_key, False)
+			update_contact_properties(email, properties, horizon_loops_api_key, False)
 			
 	except Exception as e:
 		print(f"Error updating contact property: {e}")
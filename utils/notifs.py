@@ -29,9 +29,12 @@ def initialize_firebase(service_account_path):
 		print(f"Error initializing Firebase: {e}")
 		raise e
 
-def send_notification(token, title, body, data=None, click_action=None, link=None):
+# FCM accepts at most 500 messages per batch send
+fcm_max_batch_size = 500
+
+def build_notification_message(token, title, body, data=None, click_action=None, link=None):
 	"""
-	Send a notification to a device using FCM.
+	Build the FCM message sent by send_notification / send_notifications_batch.
 	
 	Args:
 		token: The FCM registration token of the target device
@@ -42,7 +45,7 @@ def send_notification(token, title, body, data=None, click_action=None, link=Non
 		link: Optional URL to open when notification is clicked
 	
 	Returns:
-		The message ID as a string if successful, None otherwise
+		messaging.Message
 	"""
 	# Set up the notification
 	notification = messaging.Notification(
@@ -87,7 +90,7 @@ def send_notification(token, title, body, data=None, click_action=None, link=Non
 
 	
 	# Create the message with platform-specific configurations
-	message = messaging.Message(
+	return messaging.Message(
 		notification=notification,
 		data=data,
 		token=token,
@@ -95,6 +98,16 @@ def send_notification(token, title, body, data=None, click_action=None, link=Non
 		apns=apns_config,
 		# webpush=webpush_config
 	)
+
+def send_notification(token, title, body, data=None, click_action=None, link=None):
+	"""
+	Send a notification to a device using FCM.
+	Arguments are the same as build_notification_message.
+	
+	Returns:
+		The message ID as a string if successful, None otherwise
+	"""
+	message = build_notification_message(token, title, body, data=data, click_action=click_action, link=link)
 	
 	try:
 		# Send the message
@@ -104,6 +117,22 @@ def send_notification(token, title, body, data=None, click_action=None, link=Non
 		print(f"Failed to send notification: {e}")
 		return None
 
+def send_notifications_batch(messages):
+	"""
+	Send many FCM messages with batched send_each calls (up to 500 messages per call).
+	
+	Args:
+		messages: List of messaging.Message, e.g. from build_notification_message
+	
+	Returns:
+		List of messaging.SendResponse in the same order as messages
+	"""
+	responses = []
+	for i in range(0, len(messages), fcm_max_batch_size):
+		batch_response = messaging.send_each(messages[i:i + fcm_max_batch_size])
+		responses.extend(batch_response.responses)
+	return responses
+
 def send_ios_image_notification(token, title, body, image_url, image_data=None, data=None, link=None):
 	"""
 	Send a notification with an image to an iOS device using FCM.
@@ -211,7 +240,7 @@ def send_multicast_notification(tokens, title, body, data=None):
 	
 	try:
 		# Send the multicast message
-		response = messaging.send_multicast(message)
+		response = messaging.send_each_for_multicast(message)
 		print(f"Successfully sent message to {response.success_count} devices.")
 		return response
 	except Exception as e:
@@ -0,0 +1,26 @@
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+
+async def receive_orjson(websocket: WebSocket):
+	"""
+	Drop-in replacement for websocket.receive_json() that decodes with orjson.
+	Accepts both text and binary frames, since frames carrying imageBytes can be several MB
+	and stdlib json is the bottleneck there.
+	"""
+	message = await websocket.receive()
+	if message["type"] == "websocket.disconnect":
+		raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+
+	data = message.get("text")
+	if data is None:
+		data = message.get("bytes")
+	return orjson.loads(data)
+
+
+async def send_orjson(websocket: WebSocket, data):
+	"""
+	Drop-in replacement for websocket.send_json() that encodes with orjson.
+	Still sent as a text frame so clients see the same messages as before.
+	"""
+	await websocket.send_text(orjson.dumps(data).decode())